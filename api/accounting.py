@@ -0,0 +1,125 @@
+import itertools
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from load_model import BatchStats
+
+
+@dataclass
+class RequestUsage:
+    """Resources one translation consumed, for metrics, tenant billing and Server-Timing."""
+    queue_seconds: float
+    wall_seconds: float  # inference time of the batch the request ran in
+    cpu_seconds: float  # its share of the process CPU time (all threads) while its batch ran
+    tensor_bytes: int  # its share of peak tensor memory (measured on CUDA, estimated on CPU)
+    peak_rss_delta_bytes: int  # growth of the process peak RSS during its batch
+    input_tokens: int
+    output_tokens: int
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value; durations are in milliseconds."""
+        return (
+            f"queue;dur={self.queue_seconds * 1000:.1f}, "
+            f"inference;dur={self.wall_seconds * 1000:.1f}, "
+            f"cpu;dur={self.cpu_seconds * 1000:.1f}"
+        )
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far, in bytes (0 where ``resource`` is unavailable, e.g. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ProcessCpuMeter:
+    """
+    Attributes process CPU time to concurrently running inference batches.
+
+    ``time.thread_time`` of the inference thread misses the work torch runs
+    on its intra-op thread pool, so batches are charged process CPU time
+    instead. The CPU time consumed between two batch starts or ends is split
+    equally among the batches running in that interval, so concurrent
+    batches are not charged for each other. CPU used by the rest of the
+    process while a batch runs (request handlers, logging) is included.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._running: Dict[int, float] = {}
+        self._last = time.process_time()
+
+    def _advance(self):
+        now = time.process_time()
+        if self._running:
+            share = (now - self._last) / len(self._running)
+            for batch in self._running:
+                self._running[batch] += share
+        self._last = now
+
+    def start(self) -> int:
+        """Start charging a batch; returns the token to pass to ``stop``."""
+        with self._lock:
+            self._advance()
+            batch = next(self._ids)
+            self._running[batch] = 0.0
+            return batch
+
+    def stop(self, batch: int) -> float:
+        """Stop charging a batch and return its CPU seconds."""
+        with self._lock:
+            self._advance()
+            return self._running.pop(batch)
+
+
+def split_batch_usage(stats: Optional["BatchStats"], queue_seconds: List[float], wall_seconds: float,
+                      cpu_seconds: float, peak_rss_delta_bytes: int) -> List[RequestUsage]:
+    """
+    Attribute the resources of one inference batch to its requests.
+
+    CPU time is split in proportion to each request's input plus output tokens
+    (equally when no token counts are available). Tensor bytes come from the
+    batch's per-text accounting. Wall time and RSS growth are properties of the
+    whole batch and are reported to every request in it.
+
+    Args:
+        stats: Token and memory accounting of the batch, if the translator reported it
+        queue_seconds: Time each request waited before its batch started
+        wall_seconds: Inference wall time of the batch
+        cpu_seconds: Process CPU time attributed to the batch (see ProcessCpuMeter)
+        peak_rss_delta_bytes: Growth of the process peak RSS during the batch
+
+    Returns:
+        List[RequestUsage]: One usage per request, in batch order
+    """
+    count = len(queue_seconds)
+    input_tokens = stats.input_tokens if stats else [0] * count
+    output_tokens = stats.output_tokens if stats else [0] * count
+    tensor_bytes = stats.tensor_bytes if stats else [0] * count
+    tokens = [tokens_in + tokens_out for tokens_in, tokens_out in zip(input_tokens, output_tokens)]
+    total_tokens = sum(tokens)
+
+    return [
+        RequestUsage(
+            queue_seconds=queue_seconds[index],
+            wall_seconds=wall_seconds,
+            cpu_seconds=cpu_seconds * (tokens[index] / total_tokens if total_tokens else 1 / count),
+            tensor_bytes=tensor_bytes[index],
+            peak_rss_delta_bytes=peak_rss_delta_bytes,
+            input_tokens=input_tokens[index],
+            output_tokens=output_tokens[index]
+        )
+        for index in range(count)
+    ]
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+
+# Beam multiplier for inputs at or below short_tokens, and at or above long_tokens
+SHORT_INPUT_FACTOR = 1.5
+LONG_INPUT_FACTOR = 0.5
+# Beam multiplier at full load (queue full or latency at twice the target)
+FULL_LOAD_FACTOR = 0.25
+
+
+@dataclass
+class AdaptiveBeamPolicy:
+    """
+    Picks a per-request beam width from input length and current load.
+
+    Short inputs are cheap to search, so they get up to SHORT_INPUT_FACTOR times
+    the preset's beams; long inputs scale down towards LONG_INPUT_FACTOR. Load
+    pressure (queue fill, or recent lane latency above target) scales the
+    result down further, to FULL_LOAD_FACTOR at saturation. Greedy presets are
+    left alone. See tests/beam_tradeoff.py for the measured quality/latency curves.
+    """
+    min_beams: int = 1
+    max_beams: int = 8
+    short_tokens: int = 16
+    long_tokens: int = 256
+    target_latency: float = 2.0  # seconds
+
+    def choose(self, base_beams: int, tokens: int, queue_fraction: float, recent_latency: float) -> int:
+        """
+        Choose the beam width for one request.
+
+        Args:
+            base_beams: The preset's num_beams
+            tokens: Estimated input tokens
+            queue_fraction: Queued work as a fraction of the admission bound
+            recent_latency: Recent latency of the request's lane in seconds (0 if unknown)
+
+        Returns:
+            int: Beam width within [min_beams, max_beams]
+        """
+        if base_beams <= 1:
+            return base_beams
+
+        span = max(1, self.long_tokens - self.short_tokens)
+        length_ratio = min(1.0, max(0.0, (tokens - self.short_tokens) / span))
+        length_factor = SHORT_INPUT_FACTOR + (LONG_INPUT_FACTOR - SHORT_INPUT_FACTOR) * length_ratio
+
+        latency_excess = (recent_latency - self.target_latency) / self.target_latency if self.target_latency > 0 else 0.0
+        pressure = min(1.0, max(0.0, queue_fraction, latency_excess))
+        load_factor = 1.0 - pressure * (1.0 - FULL_LOAD_FACTOR)
+
+        beams = round(base_beams * length_factor * load_factor)
+        return min(self.max_beams, max(self.min_beams, beams))
@@ -0,0 +1,109 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import secrets
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from api.metrics import CAPTURE_DROPPED
+from utils.text_processing import estimate_tokens, split_sentences
+
+logger = logging.getLogger(__name__)
+
+# Records waiting for the writer thread; beyond this, new records are dropped
+DEFAULT_MAX_PENDING = 10000
+# Records written per os.write call
+WRITE_BATCH = 100
+HASH_BYTES = 8
+
+
+class TrafficCapture:
+    """
+    Appends a privacy-filtered record of sampled requests to a JSONL file.
+
+    Request handlers only enqueue the raw record; a background thread
+    replaces the text with keyed hashes of the whole text and of each
+    sentence, plus their estimated token counts, and appends the result.
+    Texts never reach the disk, but repeated texts and sentences keep equal
+    hashes, so replays and cache simulations see the original duplication.
+
+    Lines are appended with single ``O_APPEND`` writes, so several worker
+    processes can share one file. Hashes only match across processes (and
+    restarts) when they share ``hash_key``.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, hash_key: str = "",
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        if not hash_key:
+            logger.warning("CAPTURE_HASH_KEY is not set; capture hashes will differ between workers")
+        self._key = hashlib.sha256(hash_key.encode("utf-8")).digest() if hash_key else secrets.token_bytes(32)
+        self._pending: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max_pending)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def sampled(self) -> bool:
+        """Decide whether to capture the next request."""
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, entry: Dict):
+        """Queue a request record; ``entry["text"]`` is replaced by hashes before writing."""
+        try:
+            self._pending.put_nowait(entry)
+        except queue.Full:
+            CAPTURE_DROPPED.inc()
+
+    def close(self):
+        """Write the queued records and stop the writer thread."""
+        if self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+
+    def hash(self, text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=HASH_BYTES, key=self._key).hexdigest()
+
+    def filter(self, entry: Dict) -> Dict:
+        """Replace the request text with its length, hashes and per-sentence token counts."""
+        entry = dict(entry)
+        text = entry.pop("text")
+        entry["chars"] = len(text)
+        entry["tokens"] = estimate_tokens(text)
+        entry["text_hash"] = self.hash(text)
+        entry["segments"] = [[self.hash(segment), estimate_tokens(segment)] for segment in split_sentences(text)]
+        return entry
+
+    def _run(self):
+        while True:
+            entries: List[Optional[Dict]] = [self._pending.get()]
+            while entries[-1] is not None and len(entries) < WRITE_BATCH:
+                try:
+                    entries.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for entry in entries:
+                if entry is None:
+                    continue
+                try:
+                    lines.append(json.dumps(self.filter(entry), ensure_ascii=False) + "\n")
+                except Exception as e:
+                    logger.error(f"Failed to capture request: {str(e)}")
+            if lines:
+                try:
+                    os.write(self._fd, "".join(lines).encode("utf-8"))
+                except OSError as e:
+                    logger.error(f"Failed to write traffic capture: {str(e)}")
+
+            if entries[-1] is None:
+                os.close(self._fd)
+                return
@@ -1,9 +1,16 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
 import os
 
+def split_csv(value: str) -> List[str]:
+    """Split a comma-separated setting into its non-empty items."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
 class APISettings(BaseModel):
     """API configuration settings."""
+    # Coerce environment overrides (always strings) to the field types
+    model_config = ConfigDict(validate_assignment=True)
+
     # API settings
     API_TITLE: str = "IndieTalk Translation API"
     API_DESCRIPTION: str = "A REST API for Hindi to English translation using IndicTrans model"
@@ -17,9 +24,66 @@ class APISettings(BaseModel):
     # Model settings
     MODEL_DEVICE: str = "cpu"  # Using CPU version of PyTorch
     DEFAULT_CONFIG: str = "default"  # or "fast" or "high_quality"
+    MODEL_PATH: str = "artifacts/model"  # Pinned local artifact directory (see tools/cache_model.py)
+    MODEL_OFFLINE: bool = False  # Fail to start instead of using the hub when MODEL_PATH is missing
+    MODEL_PRECISION: str = "fp32"  # "fp32", "bf16", "fp16" or "int8" (dynamic quantization, CPU)
+    MASK_PLACEHOLDERS: bool = False  # pass URLs, emails, numbers and Latin-script spans through untranslated
+    
+    # Admin endpoints (model hot swap) are disabled while ADMIN_TOKEN is empty
+    ADMIN_TOKEN: str = ""
+    
+    # Inference queue, scheduling lanes and admission control
+    INFERENCE_WORKERS: int = 2  # threads running generate concurrently
+    LANES: str = ""  # JSON overrides of api.scheduler.DEFAULT_LANES, e.g. '{"fast": {"max_batch_size": 32}}'
+    MAX_QUEUE_WORK: float = 50000  # queued work bound, in estimated input tokens x beams
+    QUEUE_TIMEOUT: float = 30.0  # seconds a request may wait for inference (below gunicorn's 120s)
+    
+    # Adaptive beam width (see api/adaptive_beams.py and tests/beam_tradeoff.py)
+    ADAPTIVE_BEAMS: bool = False
+    ADAPTIVE_MIN_BEAMS: int = 1
+    ADAPTIVE_MAX_BEAMS: int = 8
+    ADAPTIVE_SHORT_TOKENS: int = 16
+    ADAPTIVE_LONG_TOKENS: int = 256
+    ADAPTIVE_TARGET_LATENCY: float = 2.0  # seconds
+    
+    # Warmup settings (comma-separated lists)
+    WARMUP_ENABLED: bool = True
+    WARMUP_PRESETS: str = "default,fast,high_quality"
+    WARMUP_LENGTHS: str = "16,128"  # input lengths in tokens
+    WARMUP_BATCH_SIZES: str = "1,4"
     
-    # Rate limiting
-    RATE_LIMIT: int = 100  # requests per minute
+    # Rate limiting, per API key or client IP
+    RATE_LIMIT: int = 100  # units per minute; a unit is a default-preset request of up to 64 tokens (0 disables)
+    RATE_LIMIT_BURST: float = 0  # bucket capacity in units; 0 uses RATE_LIMIT
+    RATE_LIMIT_SHARED_PATH: str = ""  # e.g. /dev/shm/indietalk-ratelimit to share buckets across workers
+    
+    # Logging; records are written by a background thread (see api/logs.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True  # one JSON object per line instead of plain text
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0  # fraction of successful requests logged; errors always are
+    # Log files (rotated by size) and the in-memory buffer behind /logs
+    LOG_MAX_BYTES: int = 50 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_BUFFER_LINES: int = 1000
+    
+    # Per-request resource accounting (see api/accounting.py)
+    TENANT_KEYS: str = ""  # JSON object mapping API keys (X-API-Key) to tenant names for the per-tenant metrics
+    TENANT_HEADER: str = ""  # e.g. "X-Tenant-ID": trust this header for tenants instead; only behind an authenticating proxy
+    TENANTS: str = ""  # comma-separated tenants TENANT_HEADER may name; others are counted as "other"
+    USAGE_IN_RESPONSE: bool = False  # add a "usage" object to /translate responses
+    SERVER_TIMING: bool = False  # add a Server-Timing header (queue, inference and CPU milliseconds)
+    
+    # Opt-in traffic capture for tools/replay.py and tools/cache_sim.py (see api/capture.py)
+    CAPTURE_ENABLED: bool = False
+    CAPTURE_PATH: str = "logs/traffic.jsonl"
+    CAPTURE_SAMPLE_RATE: float = 1.0  # fraction of /translate requests captured
+    CAPTURE_HASH_KEY: str = ""  # shared secret keying text hashes; set it so hashes match across workers
+    
+    # On-demand profiling through /admin/profile (see api/profiling.py)
+    PROFILE_DIR: str = "logs/profiles"
+    PROFILE_SAMPLE_INTERVAL: float = 0.005  # seconds between Python stack samples
+    PROFILE_DEFAULT_SECONDS: float = 30  # session length when neither requests nor seconds is given
+    PROFILE_MAX_SECONDS: float = 600  # longest session an admin may request
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -34,5 +98,21 @@ class APISettings(BaseModel):
             if env_val is not None:
                 setattr(self, field, env_val)
 
+    def resolve_model_path(self) -> Optional[str]:
+        """
+        Return MODEL_PATH if the local artifact directory exists, else None (use the hub).
+
+        Raises:
+            FileNotFoundError: If MODEL_OFFLINE is set and MODEL_PATH does not exist
+        """
+        if os.path.isdir(self.MODEL_PATH):
+            return self.MODEL_PATH
+        if self.MODEL_OFFLINE:
+            raise FileNotFoundError(
+                f"MODEL_OFFLINE is set but MODEL_PATH {self.MODEL_PATH!r} does not exist; "
+                "create it with tools/cache_model.py"
+            )
+        return None
+
 # Create settings instance
 settings = APISettings() 
\ No newline at end of file
@@ -0,0 +1,56 @@
+from dataclasses import replace
+from typing import Callable, Tuple
+
+from config.translation_config import DEGRADATION_ORDER, PRESETS, TranslationConfig
+from utils.text_processing import estimate_tokens
+
+# Prior service time per work unit (input token x beam) before any batch has run
+DEFAULT_SECONDS_PER_UNIT = 0.02
+# Shortest generation limit a deadline may force
+MIN_MAX_LENGTH = 16
+
+
+def estimate_work(text: str, config: TranslationConfig) -> float:
+    """
+    Estimate the work of translating ``text`` with ``config``.
+
+    Work is input tokens (capped at max_length, which also bounds the output) times beams.
+    """
+    return float(min(estimate_tokens(text), config.max_length) * max(1, config.num_beams))
+
+
+def plan_for_deadline(text: str, preset: str, budget: float,
+                      estimate: Callable[[str], Tuple[float, float]]) -> Tuple[str, TranslationConfig]:
+    """
+    Pick the best preset that is expected to finish within ``budget`` seconds.
+
+    Presets are tried from the requested one down DEGRADATION_ORDER
+    (high_quality -> default -> fast). If even the cheapest preset would miss
+    the deadline, its output is limited to what fits, down to MIN_MAX_LENGTH
+    tokens; input truncation keeps the preset's max_length.
+
+    Args:
+        text: Hindi text to translate
+        preset: Requested preset name
+        budget: Seconds until the client's deadline
+        estimate: Returns (queue wait seconds, seconds per work unit) for a preset
+
+    Returns:
+        Tuple[str, TranslationConfig]: The preset that will run and its configuration
+    """
+    if preset not in DEGRADATION_ORDER:
+        return preset, PRESETS[preset]
+
+    candidates = DEGRADATION_ORDER[DEGRADATION_ORDER.index(preset):]
+    for name in candidates:
+        wait, seconds_per_unit = estimate(name)
+        if wait + estimate_work(text, PRESETS[name]) * seconds_per_unit <= budget:
+            return name, PRESETS[name]
+
+    # Nothing fits: shorten generation on the cheapest preset
+    name = candidates[-1]
+    config = PRESETS[name]
+    wait, seconds_per_unit = estimate(name)
+    affordable = (budget - wait) / (seconds_per_unit * max(1, config.num_beams))
+    max_output_length = max(MIN_MAX_LENGTH, min(config.max_length, int(affordable)))
+    return name, replace(config, max_output_length=max_output_length)
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import Request
+
+# Non-standard status (nginx convention) recorded for requests abandoned by the client
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before its result was ready."""
+
+
+async def wait_for_disconnect(request: Request):
+    """
+    Return once the client disconnects.
+
+    Must only be used after the request body has been read. It blocks on
+    ``receive`` rather than polling ``Request.is_disconnected``, which never
+    sees the disconnect through BaseHTTPMiddleware (used by the logging middleware).
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await ``awaitable``, cancelling it if the client disconnects first.
+
+    Cancelling a scheduler submission removes it from its lane's queue, or stops
+    its generate call at the next decoding step, so abandoned requests stop
+    consuming inference time.
+
+    Raises:
+        ClientDisconnected: If the client disconnected before the result was ready
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        raise ClientDisconnected()
+    finally:
+        for pending in (task, watcher):
+            if not pending.done():
+                pending.cancel()
@@ -0,0 +1,122 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import List, Union
+
+# Bytes read per backwards seek when tailing a log file
+TAIL_BLOCK_SIZE = 8192
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# Attributes every LogRecord has; anything else was passed through ``extra``
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class AccessLogSampler(logging.Filter):
+    """Passes a ``rate`` fraction of records; warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+def configure_logging(handlers: List[logging.Handler], level: str = "INFO", json_format: bool = True) -> QueueListener:
+    """
+    Route all logging through a queue so request handlers never block on log I/O.
+
+    The root logger only enqueues records; a QueueListener thread formats them
+    and writes them to ``handlers``. The listener is flushed at exit.
+
+    Returns:
+        QueueListener: The started listener
+    """
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the most recent formatted log lines in memory for /logs."""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.capacity = capacity
+        self._lines = deque(maxlen=capacity)
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record) + "\n"
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self._lines.append(line)
+
+    def tail(self, lines: int) -> List[str]:
+        """Return up to the last ``lines`` buffered lines, oldest first."""
+        with self._buffer_lock:
+            return list(self._lines)[-lines:]
+
+    def covers(self, lines: int) -> bool:
+        """Whether the buffer holds at least ``lines`` lines."""
+        with self._buffer_lock:
+            return lines <= len(self._lines)
+
+
+def tail_file(path: Union[str, Path], lines: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """
+    Return the last ``lines`` lines of a file, reading backwards from its end.
+
+    Only the blocks containing those lines are read, so the cost is independent
+    of the file size.
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        blocks = []
+        newlines = 0
+        # One extra newline is needed to know the oldest line is complete
+        while position > 0 and newlines <= lines:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    data = b"".join(reversed(blocks))
+    return [line.decode("utf-8", errors="replace") for line in data.splitlines(keepends=True)[-lines:]]
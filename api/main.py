@@ -5,7 +5,7 @@ import os
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 import uvicorn
 
@@ -21,16 +21,16 @@ from config.translation_config import (
     FAST_CONFIG,
     HIGH_QUALITY_CONFIG,
     FORMAL_CONFIG,
-    CASUAL_CONFIG
+    CASUAL_CONFIG,
+    PRESETS
 )
 from api.config import settings
+from api.deadline import DEFAULT_SECONDS_PER_UNIT, plan_for_deadline
+from api.logs import configure_logging
+from api.rate_limit import client_key, create_rate_limiter, request_cost, retry_after_seconds
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Set to DEBUG for more detailed logs
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-    stream=sys.stdout
-)
+# Configure logging; records are written by a background thread
+configure_logging([logging.StreamHandler(sys.stdout)], level=settings.LOG_LEVEL, json_format=settings.LOG_JSON)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
@@ -55,22 +55,36 @@ class TranslationRequest(BaseModel):
     text: str
     config: Optional[str] = "default"
     context: Optional[str] = "auto"  # Options: auto, formal, casual
+    deadline_ms: Optional[int] = Field(default=None, gt=0)  # latency budget; may degrade the config
 
 class TranslationResponse(BaseModel):
     """Response model for translation."""
     translated_text: str
     processing_time: float
+    preset: str  # configuration that actually ran, after any deadline degradation
 
 # Initialize translator
 translator = None
 
+# Per-client token buckets, weighted by input size and preset
+rate_limiter = create_rate_limiter(
+    settings.RATE_LIMIT,
+    settings.RATE_LIMIT_BURST,
+    settings.RATE_LIMIT_SHARED_PATH
+)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the translator on startup."""
     global translator
     try:
         logger.info("Starting model initialization...")
-        translator = IndicTransModel(device=settings.MODEL_DEVICE)
+        translator = IndicTransModel(
+            device=settings.MODEL_DEVICE,
+            model_path=settings.resolve_model_path(),
+            offline=settings.MODEL_OFFLINE,
+            mask_placeholders=settings.MASK_PLACEHOLDERS
+        )
         logger.info("Created IndicTransModel instance")
         
         if not translator.load_model():
@@ -94,7 +108,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 @app.post("/translate", response_model=TranslationResponse)
-async def translate(request: TranslationRequest):
+async def translate(request: TranslationRequest, http_request: Request):
     """
     Translate Hindi text to English.
     
@@ -103,12 +117,24 @@ async def translate(request: TranslationRequest):
             - text: Hindi text to translate
             - config: Translation configuration ("default", "fast", or "high_quality")
             - context: Translation context ("auto", "formal", or "casual")
+            - deadline_ms: Optional latency budget in milliseconds
     
     Returns:
         TranslationResponse: The translation response containing:
             - translated_text: Translated English text
             - processing_time: Time taken for translation in seconds
+            - preset: Configuration that actually ran
     """
+    if rate_limiter is not None:
+        preset_config = PRESETS.get(request.config, DEFAULT_CONFIG)
+        wait = rate_limiter.acquire(client_key(http_request), request_cost(request.text, preset_config))
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": retry_after_seconds(wait)}
+            )
+
     try:
         if not translator:
             raise HTTPException(status_code=503, detail="Translation service not ready")
@@ -139,7 +165,17 @@ async def translate(request: TranslationRequest):
             )
         
         # Set base configuration
-        base_config = config_map[request.config]
+        preset = request.config
+        base_config = config_map[preset]
+        
+        # Degrade to a cheaper configuration if the deadline can't otherwise be met
+        if request.deadline_ms is not None:
+            preset, base_config = plan_for_deadline(
+                request.text,
+                preset,
+                request.deadline_ms / 1000,
+                lambda name: (0.0, DEFAULT_SECONDS_PER_UNIT)
+            )
         
         # If context is not auto, override with context-specific settings
         if request.context != "auto":
@@ -156,17 +192,15 @@ async def translate(request: TranslationRequest):
                 }
             )
         
-        # Set configuration
-        translator.set_config(base_config)
-        
-        # Perform translation
+        # Perform translation with this request's configuration
         start_time = time.time()
-        translated_text = translator.translate(request.text)
+        translated_text = translator.translate(request.text, config=base_config)
         processing_time = time.time() - start_time
         
         return TranslationResponse(
             translated_text=translated_text,
-            processing_time=processing_time
+            processing_time=processing_time,
+            preset=preset
         )
         
     except Exception as e:
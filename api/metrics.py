@@ -0,0 +1,246 @@
+from typing import TYPE_CHECKING
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from config.translation_config import TranslationConfig, preset_name
+
+if TYPE_CHECKING:
+    from api.accounting import RequestUsage
+    from load_model import BatchStats
+
+# Model-level metrics, exported on /metrics next to the Instrumentator HTTP metrics
+
+ADMISSION_REJECTIONS = Counter(
+    "translation_admission_rejections_total",
+    "Translation requests rejected by admission control",
+    ["reason"]
+)
+
+QUEUE_WORK = Gauge(
+    "translation_queue_work",
+    "Estimated work waiting for inference (input tokens x beams)"
+)
+
+QUEUE_DEPTH = Gauge(
+    "translation_queue_depth",
+    "Translation requests waiting for inference",
+    ["lane"]
+)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LANE_QUEUE_TIME = Histogram(
+    "translation_lane_queue_seconds",
+    "Time translations spend queued in their scheduling lane",
+    ["lane"],
+    buckets=LATENCY_BUCKETS
+)
+
+LANE_LATENCY = Histogram(
+    "translation_lane_latency_seconds",
+    "Time from enqueue to translation result, per scheduling lane",
+    ["lane"],
+    buckets=LATENCY_BUCKETS
+)
+
+CANCELLED_REQUESTS = Counter(
+    "translation_cancelled_total",
+    "Translations abandoned because the client disconnected",
+    ["lane", "stage"]
+)
+
+WASTED_INFERENCE_SECONDS = Counter(
+    "translation_wasted_inference_seconds_total",
+    "Inference time spent on translations whose client had disconnected",
+    ["lane"]
+)
+
+WASTED_WORK = Counter(
+    "translation_wasted_work_total",
+    "Estimated work (input tokens x beams) spent on translations whose client had disconnected",
+    ["lane"]
+)
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005) + LATENCY_BUCKETS
+
+STAGE_LATENCY = Histogram(
+    "translation_stage_seconds",
+    "Time spent in each stage of IndicTransModel (clean_text, tokenize, generate, batch_decode)",
+    ["stage", "preset", "chunks"],
+    buckets=STAGE_BUCKETS
+)
+
+# Upper bounds of the chunk-count label values, keeping its cardinality fixed
+CHUNK_LABELS = ((1, "1"), (4, "2-4"), (8, "5-8"), (16, "9-16"))
+
+
+def chunk_label(chunks: int) -> str:
+    """Bucket a per-call chunk count into a histogram label value."""
+    for bound, label in CHUNK_LABELS:
+        if chunks <= bound:
+            return label
+    return "17+"
+
+
+def observe_stage(stage: str, seconds: float, config: TranslationConfig, chunks: int):
+    """IndicTransModel stage listener exporting to STAGE_LATENCY."""
+    STAGE_LATENCY.labels(stage=stage, preset=preset_name(config), chunks=chunk_label(chunks)).observe(seconds)
+
+TOKEN_BUCKETS = (4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+REQUEST_INPUT_TOKENS = Histogram(
+    "translation_request_input_tokens",
+    "Input tokens per translated text, summed over its chunks",
+    ["preset"],
+    buckets=TOKEN_BUCKETS
+)
+
+REQUEST_OUTPUT_TOKENS = Histogram(
+    "translation_request_output_tokens",
+    "Generated tokens per translated text, summed over its chunks",
+    ["preset"],
+    buckets=TOKEN_BUCKETS
+)
+
+TOKENS = Counter(
+    "translation_tokens_total",
+    "Tokens processed by the model; divide the rate by translation_generate_seconds_total for tokens/s per worker",
+    ["preset", "direction"]
+)
+
+GENERATE_SECONDS = Counter(
+    "translation_generate_seconds_total",
+    "Time spent in generate calls",
+    ["preset"]
+)
+
+TOKENS_PER_SECOND = Gauge(
+    "translation_tokens_per_second",
+    "Input plus output tokens per second of the most recent batch",
+    ["preset"]
+)
+
+DECODE_STEPS = Histogram(
+    "translation_decode_steps",
+    "Decoding steps per generate call",
+    ["preset"],
+    buckets=TOKEN_BUCKETS
+)
+
+GENERATE_BATCH_SIZE = Histogram(
+    "translation_generate_batch_size",
+    "Chunks per generate call",
+    ["preset"],
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+PADDING_RATIO = Histogram(
+    "translation_padding_ratio",
+    "Fraction of each generate call's input batch that is padding",
+    ["preset"],
+    buckets=(0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+)
+
+CACHE_LOOKUPS = Counter(
+    "translation_cache_lookups_total",
+    "Translation cache lookups",
+    ["result"]
+)
+
+CACHE_EVICTIONS = Counter(
+    "translation_cache_evictions_total",
+    "Translation cache entries removed",
+    ["reason"]
+)
+
+CACHE_ENTRIES = Gauge(
+    "translation_cache_entries",
+    "Translations held in the cache"
+)
+
+PLACEHOLDER_TOKENS_SAVED = Counter(
+    "translation_placeholder_tokens_saved_total",
+    "Tokens kept out of the encoder (input) and decoder (output) by placeholder masking",
+    ["preset", "direction"]
+)
+
+CAPTURE_DROPPED = Counter(
+    "translation_capture_dropped_total",
+    "Captured request records dropped because the capture writer fell behind"
+)
+
+
+def observe_batch(stats: "BatchStats"):
+    """IndicTransModel batch listener exporting token throughput and batch efficiency."""
+    preset = preset_name(stats.config)
+    for tokens_in, tokens_out in zip(stats.input_tokens, stats.output_tokens):
+        REQUEST_INPUT_TOKENS.labels(preset=preset).observe(tokens_in)
+        REQUEST_OUTPUT_TOKENS.labels(preset=preset).observe(tokens_out)
+
+    total_in = sum(stats.input_tokens)
+    total_out = sum(stats.output_tokens)
+    TOKENS.labels(preset=preset, direction="input").inc(total_in)
+    TOKENS.labels(preset=preset, direction="output").inc(total_out)
+    if stats.seconds > 0:
+        TOKENS_PER_SECOND.labels(preset=preset).set((total_in + total_out) / stats.seconds)
+    if any(stats.saved_input_tokens):
+        # A placeholder can cost more tokens than a short span; counters cannot go down
+        PLACEHOLDER_TOKENS_SAVED.labels(preset=preset, direction="input").inc(max(0, sum(stats.saved_input_tokens)))
+        PLACEHOLDER_TOKENS_SAVED.labels(preset=preset, direction="output").inc(max(0, sum(stats.saved_output_tokens)))
+
+    for call in stats.calls:
+        GENERATE_SECONDS.labels(preset=preset).inc(call.seconds)
+        DECODE_STEPS.labels(preset=preset).observe(call.decode_steps)
+        GENERATE_BATCH_SIZE.labels(preset=preset).observe(call.batch_size)
+        PADDING_RATIO.labels(preset=preset).observe(call.padding_ratio)
+
+BYTE_BUCKETS = tuple(2 ** power for power in range(20, 36, 2))  # 1 MB to 16 GB
+
+REQUEST_CPU_SECONDS = Histogram(
+    "translation_request_cpu_seconds",
+    "Inference-thread CPU time attributed to each translation",
+    ["preset"],
+    buckets=STAGE_BUCKETS
+)
+
+REQUEST_TENSOR_BYTES = Histogram(
+    "translation_request_tensor_bytes",
+    "Peak tensor memory attributed to each translation (measured on CUDA, estimated on CPU)",
+    ["preset"],
+    buckets=BYTE_BUCKETS
+)
+
+REQUEST_RSS_GROWTH = Histogram(
+    "translation_request_peak_rss_growth_bytes",
+    "Growth of the process peak RSS during the batch each translation ran in",
+    ["preset"],
+    buckets=(0,) + BYTE_BUCKETS
+)
+
+TENANT_REQUESTS = Counter(
+    "translation_tenant_requests_total",
+    "Translation requests per tenant",
+    ["tenant", "cache"]
+)
+
+TENANT_CPU_SECONDS = Counter(
+    "translation_tenant_cpu_seconds_total",
+    "Inference CPU time attributed to each tenant's translations",
+    ["tenant"]
+)
+
+TENANT_TOKENS = Counter(
+    "translation_tenant_tokens_total",
+    "Tokens processed for each tenant's translations",
+    ["tenant", "direction"]
+)
+
+
+def observe_usage(preset: str, tenant: str, usage: "RequestUsage"):
+    """Export the resources of one translation, overall and for its tenant."""
+    REQUEST_CPU_SECONDS.labels(preset=preset).observe(usage.cpu_seconds)
+    REQUEST_TENSOR_BYTES.labels(preset=preset).observe(usage.tensor_bytes)
+    REQUEST_RSS_GROWTH.labels(preset=preset).observe(usage.peak_rss_delta_bytes)
+    TENANT_CPU_SECONDS.labels(tenant=tenant).inc(usage.cpu_seconds)
+    TENANT_TOKENS.labels(tenant=tenant, direction="input").inc(usage.input_tokens)
+    TENANT_TOKENS.labels(tenant=tenant, direction="output").inc(usage.output_tokens)
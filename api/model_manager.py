@@ -0,0 +1,201 @@
+import gc
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+from api.config import settings, split_csv
+from config.translation_config import TranslationConfig
+
+if TYPE_CHECKING:
+    from load_model import BatchStats
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotReadyError(Exception):
+    """Raised when no model version has been loaded yet."""
+
+
+class ModelHandle:
+    """A loaded model version and the number of batches currently running on it."""
+
+    def __init__(self, version: str, translator):
+        self.version = version
+        self.translator = translator
+        self.inflight = 0
+        self.retired = False
+        self.loaded_at = time.time()
+
+
+class ModelManager:
+    """
+    Owns the active model version and swaps in new versions without downtime.
+
+    Requests run inside ``acquire()``, which pins the version that was current
+    when they started. ``start_swap()`` loads and warms a new version in a
+    background thread, then replaces the current handle under a lock; batches
+    still running on the old version finish there, after which its memory is
+    released and ``on_retire`` callbacks (e.g. cache purges) run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._current: Optional[ModelHandle] = None
+        self._sequence = 0
+        self.state = "loading"  # loading -> warming_up -> ready, or failed
+        self.swap_status: Dict[str, Optional[str]] = {"state": "idle", "version": None, "error": None}
+        self.on_retire: List[Callable[[str], None]] = []
+        # Attached to every translator this manager loads, after any warmup
+        self.stage_listeners: List[Callable[[str, float, TranslationConfig, int], None]] = []
+        self.batch_listeners: List[Callable[["BatchStats"], None]] = []
+
+    @property
+    def current(self) -> Optional[ModelHandle]:
+        return self._current
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._current.version if self._current else None
+
+    @contextmanager
+    def acquire(self) -> Iterator[ModelHandle]:
+        """Pin the current model version for the duration of a batch."""
+        with self._lock:
+            handle = self._current
+            if handle is None:
+                raise ModelNotReadyError("Translation service not ready")
+            handle.inflight += 1
+        try:
+            yield handle
+        finally:
+            with self._lock:
+                handle.inflight -= 1
+                if handle.retired and handle.inflight == 0:
+                    self._drained.notify_all()
+
+    def _warm_up(self, translator):
+        from api.warmup import run_warmup
+
+        run_warmup(
+            translator,
+            presets=split_csv(settings.WARMUP_PRESETS),
+            lengths=[int(length) for length in split_csv(settings.WARMUP_LENGTHS)],
+            batch_sizes=[int(size) for size in split_csv(settings.WARMUP_BATCH_SIZES)]
+        )
+
+    def load_version(self, model_path: Optional[str], device: str, precision: str, warm_up: bool = True) -> ModelHandle:
+        """
+        Load (and optionally warm up) a model version without making it current.
+
+        Raises:
+            RuntimeError: If the model fails to load
+        """
+        from load_model import IndicTransModel
+
+        translator = IndicTransModel(
+            device=device,
+            model_path=model_path,
+            offline=settings.MODEL_OFFLINE,
+            precision=precision,
+            mask_placeholders=settings.MASK_PLACEHOLDERS
+        )
+        if not translator.load_model():
+            raise RuntimeError(f"Failed to load model from {translator.model_path}")
+
+        if warm_up and settings.WARMUP_ENABLED:
+            self._warm_up(translator)
+        translator.stage_listeners.extend(self.stage_listeners)
+        translator.batch_listeners.extend(self.batch_listeners)
+
+        with self._lock:
+            self._sequence += 1
+            version = f"{Path(translator.model_path).name}@{precision}#{self._sequence}"
+        return ModelHandle(version, translator)
+
+    def load_initial(self):
+        """Load the configured model as the first version (runs in a background thread)."""
+        try:
+            # Serve as soon as the weights are loaded; readiness waits for warmup
+            handle = self.load_version(
+                settings.resolve_model_path(),
+                settings.MODEL_DEVICE,
+                settings.MODEL_PRECISION,
+                warm_up=False
+            )
+            with self._lock:
+                self._current = handle
+
+            if settings.WARMUP_ENABLED:
+                self.state = "warming_up"
+                self._warm_up(handle.translator)
+            self.state = "ready"
+        except Exception as e:
+            logger.error(f"Translation model initialization failed: {str(e)}")
+            self.state = "failed"
+
+    def start_swap(self, model_path: Optional[str], device: str, precision: str) -> bool:
+        """
+        Load, warm up and swap in a new model version in the background.
+
+        Returns:
+            bool: False if another swap is already in progress
+        """
+        with self._lock:
+            if self.swap_status["state"] in ("loading", "draining"):
+                return False
+            self.swap_status = {"state": "loading", "version": None, "error": None}
+
+        threading.Thread(
+            target=self._swap,
+            args=(model_path, device, precision),
+            name="model-swap",
+            daemon=True
+        ).start()
+        return True
+
+    def _swap(self, model_path: Optional[str], device: str, precision: str):
+        try:
+            handle = self.load_version(model_path, device, precision)
+        except Exception as e:
+            logger.error(f"Model swap failed: {str(e)}")
+            self.swap_status = {"state": "failed", "version": None, "error": str(e)}
+            return
+
+        with self._lock:
+            old, self._current = self._current, handle
+            self.swap_status = {"state": "draining", "version": handle.version, "error": None}
+            if old is not None:
+                old.retired = True
+        self.state = "ready"
+        logger.info(f"Swapped in model version {handle.version}")
+
+        if old is not None:
+            self._retire(old)
+        self.swap_status = {"state": "done", "version": handle.version, "error": None}
+
+    def _retire(self, handle: ModelHandle):
+        """Wait for in-flight batches on an old version, then release its memory."""
+        with self._lock:
+            while handle.inflight > 0:
+                self._drained.wait()
+
+        for callback in self.on_retire:
+            try:
+                callback(handle.version)
+            except Exception as e:
+                logger.error(f"Error in model retire callback: {str(e)}")
+
+        handle.translator.model = None
+        handle.translator.tokenizer = None
+        handle.translator = None
+        gc.collect()
+
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info(f"Released model version {handle.version}")
@@ -1,30 +1,78 @@
-from fastapi import FastAPI, HTTPException, Request
+import time
+
+# Reference point for cold-start timings, taken before any other import
+PROCESS_START = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request, Response, Depends, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from cachetools import LRUCache, cached
-from pydantic import BaseModel
+from cachetools import LRUCache
+from cachetools.keys import hashkey
+from pydantic import BaseModel, Field
 from typing import Optional
+import json
 import logging
-import time
+import secrets
+from logging.handlers import RotatingFileHandler
+import threading
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 from prometheus_fastapi_instrumentator import Instrumentator
-from load_model import IndicTransModel
+from api.adaptive_beams import AdaptiveBeamPolicy
+from api.capture import TrafficCapture
+from api.config import settings, split_csv
+from api.deadline import plan_for_deadline
+from api.disconnect import CLIENT_CLOSED_REQUEST, ClientDisconnected, cancel_on_disconnect
+from api.logs import AccessLogSampler, RingBufferHandler, configure_logging, tail_file
+from api.metrics import (
+    ADMISSION_REJECTIONS,
+    CACHE_ENTRIES,
+    CACHE_EVICTIONS,
+    CACHE_LOOKUPS,
+    TENANT_REQUESTS,
+    observe_batch,
+    observe_stage,
+    observe_usage
+)
+from api.model_manager import ModelManager, ModelNotReadyError
+from api.profiling import InferenceProfiler, ProfilerBusy
+from api.rate_limit import client_key, create_rate_limiter, request_cost, retry_after_seconds
+from api.scheduler import AdmissionRejected, InferenceScheduler, parse_lane_specs
+from config.translation_config import PRESETS, TranslationConfig
+from utils.text_processing import estimate_tokens
+
+# Must match IndicTransModel.PRECISIONS; duplicated to keep torch out of the import path
+MODEL_PRECISIONS = ("fp32", "bf16", "fp16", "int8")
 
 # Configure logging
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_dir / "api_logs.log"),
-        logging.StreamHandler()
-    ]
+# Recent lines are kept in memory so /logs rarely touches the (size-rotated) file
+log_buffer = RingBufferHandler(settings.LOG_BUFFER_LINES)
+
+configure_logging(
+    [
+        RotatingFileHandler(
+            log_dir / "api_logs.log",
+            maxBytes=settings.LOG_MAX_BYTES,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        ),
+        logging.StreamHandler(),
+        log_buffer
+    ],
+    level=settings.LOG_LEVEL,
+    json_format=settings.LOG_JSON
 )
 logger = logging.getLogger(__name__)
 
+# One record per request, sampled by ACCESS_LOG_SAMPLE_RATE; server errors are always logged
+access_logger = logging.getLogger("api.access")
+access_logger.addFilter(AccessLogSampler(settings.ACCESS_LOG_SAMPLE_RATE))
+
 # Initialize FastAPI app
 app = FastAPI(
     title="IndicTrans Translation API",
@@ -41,101 +89,395 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize translation model
-translator = IndicTransModel()
-if not translator.load_model():
-    logger.error("Failed to initialize translation model")
-    raise RuntimeError("Translation model initialization failed")
+# Translation model, loaded in the background after startup so /health answers
+# immediately. torch/transformers are only imported by the loader thread.
+manager = ModelManager()
+first_translation_logged = False
+
+class MeteredLRUCache(LRUCache):
+    """LRUCache counting capacity evictions."""
+
+    def popitem(self):
+        item = super().popitem()
+        CACHE_EVICTIONS.labels(reason="capacity").inc()
+        return item
+
+# Initialize cache, keyed by model version so a swapped-out model is never served
+cache = MeteredLRUCache(maxsize=1000)
+cache_lock = threading.Lock()
+
+def cache_key(version: Optional[str], text: str, preset: str, config: TranslationConfig):
+    """Cache key of a translation; generation limits are included so degraded output stays separate."""
+    return hashkey(version, text, preset, config.max_length, config.max_output_length, config.num_beams)
+
+# Billing tenants: API keys (the identity the rate limiter charges) mapped to
+# tenant names, or the tenant names a trusted proxy may send in TENANT_HEADER.
+# Anything else is counted as "other" so clients cannot create new series.
+tenant_keys = json.loads(settings.TENANT_KEYS) if settings.TENANT_KEYS else {}
+known_tenants = frozenset(split_csv(settings.TENANTS))
+
+def tenant_label(request: Request) -> str:
+    """
+    Billing tenant of a request, for the per-tenant metrics.
+
+    With TENANT_HEADER set, the header is trusted (it must be set by an
+    authenticating proxy) and only names listed in TENANTS are kept.
+    Otherwise the tenant comes from the request's API key through TENANT_KEYS.
+    Requests without a header or key are "default"; unknown ones are "other".
+    """
+    if settings.TENANT_HEADER:
+        tenant = request.headers.get(settings.TENANT_HEADER)
+        if not tenant:
+            return "default"
+        return tenant if tenant in known_tenants else "other"
+
+    key = client_key(request)
+    if not key.startswith("key:"):
+        return "default"
+    return tenant_keys.get(key[len("key:"):], "other")
+
+def purge_model_version(version: str):
+    """Drop cached translations produced by a retired model version."""
+    with cache_lock:
+        for key in [key for key in cache.keys() if key[0] == version]:
+            cache.pop(key, None)
+            CACHE_EVICTIONS.labels(reason="retired_model").inc()
+        CACHE_ENTRIES.set(len(cache))
+
+manager.on_retire.append(purge_model_version)
+# Per-stage latency, token throughput and batch efficiency, exported on /metrics
+# next to the Instrumentator metrics
+manager.stage_listeners.append(observe_stage)
+manager.batch_listeners.append(observe_batch)
+
+# Sampled, privacy-filtered request records for replay and cache simulation
+capture = TrafficCapture(
+    settings.CAPTURE_PATH,
+    sample_rate=settings.CAPTURE_SAMPLE_RATE,
+    hash_key=settings.CAPTURE_HASH_KEY
+) if settings.CAPTURE_ENABLED else None
+
+# Per-client token buckets, weighted by input size and preset
+rate_limiter = create_rate_limiter(
+    settings.RATE_LIMIT,
+    settings.RATE_LIMIT_BURST,
+    settings.RATE_LIMIT_SHARED_PATH
+)
+
+# Per-request beam width from input length and load, when enabled
+beam_policy = AdaptiveBeamPolicy(
+    min_beams=settings.ADAPTIVE_MIN_BEAMS,
+    max_beams=settings.ADAPTIVE_MAX_BEAMS,
+    short_tokens=settings.ADAPTIVE_SHORT_TOKENS,
+    long_tokens=settings.ADAPTIVE_LONG_TOKENS,
+    target_latency=settings.ADAPTIVE_TARGET_LATENCY
+) if settings.ADAPTIVE_BEAMS else None
 
-# Initialize cache
-cache = LRUCache(maxsize=1000)
+# On-demand profiling of inference batches, driven by /admin/profile
+profiler = InferenceProfiler(settings.PROFILE_DIR, settings.PROFILE_SAMPLE_INTERVAL)
+
+# Admission-controlled inference queue in front of the model
+scheduler = InferenceScheduler(
+    manager,
+    lanes=parse_lane_specs(settings.LANES),
+    max_queue_work=settings.MAX_QUEUE_WORK,
+    default_timeout=settings.QUEUE_TIMEOUT,
+    workers=settings.INFERENCE_WORKERS,
+    profiler=profiler
+)
 
 class TranslationRequest(BaseModel):
     text: str
     config: Optional[str] = "default"  # "default", "fast", or "high_quality"
+    deadline_ms: Optional[int] = Field(default=None, gt=0)  # latency budget; may degrade the preset
 
-@cached(cache)
-def cached_translation(text: str, config: str) -> str:
-    """
-    Cached translation function with configurable quality settings.
-    """
-    try:
-        # Set configuration based on request
-        if config == "fast":
-            from config.translation_config import FAST_CONFIG
-            translator.set_config(FAST_CONFIG)
-        elif config == "high_quality":
-            from config.translation_config import HIGH_QUALITY_CONFIG
-            translator.set_config(HIGH_QUALITY_CONFIG)
-        else:
-            from config.translation_config import DEFAULT_CONFIG
-            translator.set_config(DEFAULT_CONFIG)
-        
-        return translator.translate(text)
-    except Exception as e:
-        logger.error(f"Translation error: {str(e)}")
-        raise
+class ModelSwapRequest(BaseModel):
+    model_path: Optional[str] = None  # local directory or hub name; defaults to MODEL_PATH
+    device: Optional[str] = None
+    precision: Optional[str] = None  # "fp32", "bf16", "fp16" or "int8"
+
+class ProfileRequest(BaseModel):
+    requests: Optional[int] = Field(default=None, gt=0)  # stop after this many translations
+    seconds: Optional[float] = Field(default=None, gt=0)  # or after this long, whichever comes first
+    torch_trace: bool = True  # also record torch.profiler Chrome traces of each batch
+
+def load_initial_model():
+    """Load and warm up the configured model, logging cold-start timings."""
+    manager.load_initial()
+    logger.info(f"Cold start: {manager.state} {time.perf_counter() - PROCESS_START:.2f}s after process start")
+
+@app.on_event("startup")
+async def startup_event():
+    """Start loading the model without blocking the event loop."""
+    threading.Thread(target=load_initial_model, name="model-loader", daemon=True).start()
+    scheduler.start()
+    logger.info(f"Cold start: healthy {time.perf_counter() - PROCESS_START:.2f}s after process start")
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    """Dependency guarding admin endpoints with the ADMIN_TOKEN setting."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
 
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint to ensure the API is running.
     """
-    return {"status": "ok", "model_loaded": translator.model is not None}
+    return {"status": "ok", "model_loaded": manager.current is not None, "model_version": manager.version}
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint for load balancers: 200 only once the model is loaded and warmed up.
+    """
+    if manager.state != "ready":
+        return JSONResponse(status_code=503, content={"status": manager.state})
+    return {"status": "ready"}
+
+@app.get("/admin/model", dependencies=[Depends(verify_admin_token)])
+async def get_model_status():
+    """
+    Report the active model version and the state of the last hot swap.
+    """
+    return {"version": manager.version, "state": manager.state, "swap": manager.swap_status}
+
+@app.post("/admin/model", status_code=202, dependencies=[Depends(verify_admin_token)])
+async def swap_model(request: ModelSwapRequest):
+    """
+    Load, warm up and atomically swap in a new model version in the background.
+    """
+    precision = request.precision or settings.MODEL_PRECISION
+    if precision not in MODEL_PRECISIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid precision. Must be one of: {list(MODEL_PRECISIONS)}"
+        )
+
+    try:
+        model_path = request.model_path or settings.resolve_model_path()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    started = manager.start_swap(
+        model_path,
+        request.device or settings.MODEL_DEVICE,
+        precision
+    )
+    if not started:
+        raise HTTPException(status_code=409, detail="A model swap is already in progress")
+    return {"status": "swapping", "current_version": manager.version}
+
+@app.post("/admin/profile", status_code=202, dependencies=[Depends(verify_admin_token)])
+async def start_profiling(request: ProfileRequest):
+    """
+    Profile this worker for the next N translations or T seconds.
+
+    Artifacts (folded Python stacks, Chrome traces and operator tables) are
+    written under PROFILE_DIR. Only the worker process serving this request
+    is profiled.
+    """
+    seconds = request.seconds
+    if seconds is None and request.requests is None:
+        seconds = settings.PROFILE_DEFAULT_SECONDS
+    if seconds is not None and seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Profiling sessions are limited to {settings.PROFILE_MAX_SECONDS:g} seconds"
+        )
+    try:
+        return profiler.start(request.requests, seconds, request.torch_trace)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/admin/profile", dependencies=[Depends(verify_admin_token)])
+async def get_profiling_status():
+    """
+    Report the active or most recent profiling session of this worker.
+    """
+    return profiler.status()
+
+@app.delete("/admin/profile", dependencies=[Depends(verify_admin_token)])
+async def stop_profiling():
+    """
+    End the active profiling session early.
+    """
+    summary = profiler.stop()
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No profiling session has run")
+    return summary
 
 @app.post("/translate")
-async def translate(request: TranslationRequest):
+async def translate(request: TranslationRequest, http_request: Request, response: Response):
     """
     Optimized translation endpoint with caching.
     """
+    global first_translation_logged
+    tenant = tenant_label(http_request)
+    usage = None
+    preset = requested_preset = request.config if request.config in PRESETS else "default"
+    # Completed and written by the log_requests middleware once the status is known
+    captured = None
+    if capture is not None and capture.sampled():
+        captured = http_request.state.capture = {
+            "ts": time.time(),
+            "text": request.text,
+            "preset": requested_preset,
+            "deadline_ms": request.deadline_ms
+        }
+
+    if rate_limiter is not None:
+        wait = rate_limiter.acquire(client_key(http_request), request_cost(request.text, PRESETS[preset]))
+        if wait > 0:
+            ADMISSION_REJECTIONS.labels(reason="rate_limited").inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": retry_after_seconds(wait)}
+            )
+
     try:
+        config = PRESETS[preset]
+
         # Use cached translation to reduce redundant computations
-        translated_text = cached_translation(request.text, request.config)
-        return {"translated_text": translated_text}
+        with cache_lock:
+            translated_text = cache.get(cache_key(manager.version, request.text, preset, config))
+
+        if translated_text is None and (request.deadline_ms is not None or beam_policy is not None):
+            if request.deadline_ms is not None:
+                # Degrade to a cheaper preset or shorter output if the deadline can't be met
+                preset, config = plan_for_deadline(
+                    request.text, preset, request.deadline_ms / 1000, scheduler.estimate_lane
+                )
+            if beam_policy is not None:
+                queue_fraction, recent_latency = scheduler.load_signals(preset)
+                num_beams = beam_policy.choose(
+                    config.num_beams, estimate_tokens(request.text), queue_fraction, recent_latency
+                )
+                config = replace(config, num_beams=num_beams)
+            with cache_lock:
+                translated_text = cache.get(cache_key(manager.version, request.text, preset, config))
+
+        CACHE_LOOKUPS.labels(result="miss" if translated_text is None else "hit").inc()
+        if translated_text is None:
+            timeout = request.deadline_ms / 1000 if request.deadline_ms is not None else None
+            # Abandon the translation if the client disconnects while it is queued or running
+            translated_text, version, usage = await cancel_on_disconnect(
+                http_request, scheduler.submit(request.text, preset, config, timeout=timeout)
+            )
+            with cache_lock:
+                cache[cache_key(version, request.text, preset, config)] = translated_text
+                CACHE_ENTRIES.set(len(cache))
+
+        TENANT_REQUESTS.labels(tenant=tenant, cache="hit" if usage is None else "miss").inc()
+        if captured is not None:
+            captured.update(
+                served_preset=preset,
+                cache="hit" if usage is None else "miss",
+                inference_seconds=usage.wall_seconds if usage else None,
+                cpu_seconds=usage.cpu_seconds if usage else None,
+                output_tokens=usage.output_tokens if usage else None
+            )
+        if usage is not None:
+            observe_usage(preset, tenant, usage)
+        if settings.SERVER_TIMING:
+            response.headers["Server-Timing"] = usage.server_timing() if usage else 'cache;desc="hit"'
+
+        if not first_translation_logged:
+            first_translation_logged = True
+            logger.info(
+                f"Cold start: first translation served {time.perf_counter() - PROCESS_START:.2f}s "
+                f"after process start"
+            )
+        body = {
+            "translated_text": translated_text,
+            "preset": preset,
+            "max_length": config.max_output_length or config.max_length,
+            "num_beams": config.num_beams,
+            "degraded": (
+                preset != requested_preset
+                or config.max_output_length is not None
+                or config.num_beams < PRESETS[preset].num_beams
+            )
+        }
+        if settings.USAGE_IN_RESPONSE and usage is not None:
+            body["usage"] = usage.as_dict()
+        return body
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ClientDisconnected:
+        logger.info("Client disconnected, translation cancelled")
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
     except Exception as e:
         logger.error(f"Translation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
 
+def record_capture(request: Request, status: int, duration: float):
+    """Hand a request captured by its endpoint to the capture writer."""
+    captured = getattr(request.state, "capture", None)
+    if captured is not None:
+        captured.update(status=status, latency=duration)
+        capture.record(captured)
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """
     Middleware to log all requests for monitoring and debugging.
     """
     start_time = time.time()
-    logger.info(f"Request: {request.method} {request.url}")
-    
     try:
         response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        # Log response details
-        logger.info(
-            f"Response: {request.method} {request.url} - Status: {response.status_code} - Time: {process_time:.2f}s"
-        )
-        
-        # Add response time to headers
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-        
     except Exception as e:
         process_time = time.time() - start_time
-        logger.error(
-            f"Error: {request.method} {request.url} - Error: {str(e)} - Time: {process_time:.2f}s"
+        record_capture(request, 500, process_time)
+        access_logger.error(
+            "%s %s failed: %s (%.3fs)", request.method, request.url.path, e, process_time,
+            extra={"method": request.method, "path": request.url.path, "error": str(e), "duration": process_time}
         )
         raise
 
+    process_time = time.time() - start_time
+    record_capture(request, response.status_code, process_time)
+    access_logger.log(
+        logging.ERROR if response.status_code >= 500 else logging.INFO,
+        "%s %s %d (%.3fs)", request.method, request.url.path, response.status_code, process_time,
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration": process_time
+        }
+    )
+
+    # Add response time to headers
+    response.headers["X-Process-Time"] = str(process_time)
+    return response
+
 @app.get("/logs", include_in_schema=False)
-async def get_logs(lines: int = 100):
+async def get_logs(lines: int = Query(100, ge=1, le=10000), source: str = "auto"):
     """
     Endpoint to retrieve the last N lines of the log file.
+
+    Lines are served from this worker's in-memory buffer when it holds enough of
+    them; otherwise, or with ``source=file`` (lines from every worker), the log
+    file is read backwards from its end off the event loop.
     """
     try:
+        if source != "file" and log_buffer.covers(lines):
+            return {"logs": log_buffer.tail(lines)}
+
         log_file = log_dir / "api_logs.log"
         if not log_file.exists():
             return {"logs": ["No logs available yet."]}
             
-        with open(log_file, "r") as f:
-            logs = f.readlines()[-lines:]
+        logs = await run_in_threadpool(tail_file, log_file, lines)
         return {"logs": logs}
     except Exception as e:
         logger.error(f"Failed to fetch logs: {str(e)}")
@@ -0,0 +1,205 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames of threads that are blocked rather than working; their samples are dropped
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("handlers.py", "dequeue"),
+    ("base_events.py", "_run_once"),
+}
+# Rows of the per-batch operator table written next to each Chrome trace
+OPERATOR_TABLE_ROWS = 40
+# Batches traced per session; traces of a generate call run to tens of MB each
+MAX_TRACES = 5
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is started while another is running."""
+
+
+class ProfileSession:
+    """One profiling run: its limits, progress and artifacts."""
+
+    def __init__(self, directory: Path, max_requests: Optional[int], seconds: Optional[float], torch_trace: bool):
+        self.directory = directory
+        self.max_requests = max_requests
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.torch_trace = torch_trace
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.requests = 0
+        self.samples = 0
+        self.traces = 0
+        self.stacks: Counter = Counter()
+        self.artifacts: List[str] = []
+        self.stopped = threading.Event()
+
+    def summary(self) -> Dict:
+        return {
+            "directory": str(self.directory),
+            "max_requests": self.max_requests,
+            "requests": self.requests,
+            "samples": self.samples,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "artifacts": list(self.artifacts),
+        }
+
+
+class InferenceProfiler:
+    """
+    On-demand profiling of this worker process.
+
+    While a session is active, a background thread samples the Python stacks
+    of every thread at ``sample_interval`` and counts them as folded stacks
+    (the input format of flamegraph.pl and speedscope), and each inference
+    batch runs under ``torch.profiler`` and is exported as a Chrome trace with
+    an operator table. A session ends after ``max_requests`` translations,
+    after ``seconds``, or on ``stop()``.
+
+    When no session is active the only cost is the ``active`` check callers
+    make before ``profile_batch``; no thread runs and no hooks are installed.
+    """
+
+    def __init__(self, output_dir: str, sample_interval: float):
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.active = False
+        self.session: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+        # torch.profiler allows one profile at a time per process
+        self._trace_lock = threading.Lock()
+
+    def start(self, max_requests: Optional[int] = None, seconds: Optional[float] = None,
+              torch_trace: bool = True) -> Dict:
+        """
+        Start a session; at least one of ``max_requests`` and ``seconds`` should bound it.
+
+        Raises:
+            ProfilerBusy: If a session is already running
+        """
+        with self._lock:
+            if self.active:
+                raise ProfilerBusy("A profiling session is already running")
+            name = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+            directory = self.output_dir / name
+            directory.mkdir(parents=True, exist_ok=True)
+            session = ProfileSession(directory, max_requests, seconds, torch_trace)
+            self.session = session
+            self.active = True
+
+        threading.Thread(target=self._sample, args=(session,), name="profiler-sampler", daemon=True).start()
+        logger.info(f"Profiling started: requests={max_requests} seconds={seconds} directory={directory}")
+        return session.summary()
+
+    def stop(self) -> Optional[Dict]:
+        """End the active session, if any; its stacks are written by the sampler thread."""
+        with self._lock:
+            session = self.session
+            if not self.active or session is None:
+                return session.summary() if session else None
+            self.active = False
+            session.finished_at = time.time()
+            session.stopped.set()
+        logger.info(f"Profiling stopped after {session.requests} requests and {session.samples} samples")
+        return session.summary()
+
+    def status(self) -> Dict:
+        session = self.session
+        return {"active": self.active, "session": session.summary() if session else None}
+
+    @contextmanager
+    def profile_batch(self, requests: int) -> Iterator[None]:
+        """
+        Profile one inference batch of ``requests`` translations with torch.profiler.
+
+        Batches that overlap one already being traced, or come after MAX_TRACES
+        traces, run untraced but are still counted towards the session's request
+        limit. Traced batches resolve their requests only after the trace is written.
+        """
+        session = self.session
+        if (session is None or not session.torch_trace or session.traces >= MAX_TRACES
+                or not self._trace_lock.acquire(blocking=False)):
+            try:
+                yield
+            finally:
+                self._count(session, requests)
+            return
+
+        try:
+            import torch
+            from torch.profiler import ProfilerActivity, profile
+
+            activities = [ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(ProfilerActivity.CUDA)
+            with profile(activities=activities, record_shapes=True) as prof:
+                yield
+
+            index = session.traces
+            session.traces += 1
+            trace_path = session.directory / f"trace-{index}.json"
+            table_path = session.directory / f"operators-{index}.txt"
+            # The batch itself succeeded; a failed export must not fail its requests
+            try:
+                prof.export_chrome_trace(str(trace_path))
+                table_path.write_text(
+                    prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=OPERATOR_TABLE_ROWS),
+                    encoding="utf-8"
+                )
+                session.artifacts += [str(trace_path), str(table_path)]
+            except Exception as e:
+                logger.error(f"Failed to write profile trace: {str(e)}")
+        finally:
+            self._trace_lock.release()
+            self._count(session, requests)
+
+    def _count(self, session: Optional[ProfileSession], requests: int):
+        if session is None:
+            return
+        with self._lock:
+            session.requests += requests
+            done = session.max_requests is not None and session.requests >= session.max_requests
+        if done and session is self.session:
+            self.stop()
+
+    def _sample(self, session: ProfileSession):
+        """Sampler thread: count folded stacks until the session ends, then write them."""
+        own_id = threading.get_ident()
+        while not session.stopped.wait(self.sample_interval):
+            if session.deadline is not None and time.monotonic() >= session.deadline:
+                self.stop()
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                session.stacks[";".join(reversed(stack))] += 1
+            session.samples += 1
+
+        path = session.directory / "stacks.folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        session.artifacts.insert(0, str(path))
+        logger.info(f"Profile written to {session.directory}")
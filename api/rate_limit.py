@@ -0,0 +1,160 @@
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Tuple
+
+from cachetools import LRUCache
+from fastapi import Request
+
+from config.translation_config import DEFAULT_CONFIG, TranslationConfig
+from utils.text_processing import estimate_tokens
+
+# POSIX byte-range locks back the shared limiter; the in-process limiter works everywhere
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# One rate-limit unit is a default-preset request of up to this many input tokens
+UNIT_TOKENS = 64
+# Lower bound on the preset weight, so greedy requests are never free
+MIN_PRESET_WEIGHT = 0.25
+
+
+def request_cost(text: str, config: TranslationConfig) -> float:
+    """
+    Cost of a translation in rate-limit units, weighted by input size and preset.
+
+    A default-preset request of up to UNIT_TOKENS tokens costs 1; longer inputs
+    cost proportionally more and the preset scales the cost by its beam count
+    relative to the default preset.
+    """
+    size = max(1.0, estimate_tokens(text) / UNIT_TOKENS)
+    weight = max(MIN_PRESET_WEIGHT, config.num_beams / DEFAULT_CONFIG.num_beams)
+    return size * weight
+
+
+def client_key(request: Request) -> str:
+    """Identify the client by API key, falling back to its IP address."""
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return f"key:{api_key}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _take(tokens: float, updated: float, now: float, cost: float, rate: float, burst: float) -> Tuple[float, float]:
+    """
+    Refill a bucket and try to take ``cost`` from it.
+
+    Returns:
+        Tuple[float, float]: The new token count and the seconds to wait (0 if allowed)
+    """
+    tokens = burst if updated <= 0 else min(burst, tokens + (now - updated) * rate)
+    cost = min(cost, burst)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets keyed by client, with O(1) work per request.
+
+    Buckets refill at ``rate_per_minute`` units per minute up to ``burst``; idle
+    clients are evicted least-recently-used once ``max_clients`` is reached.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: float, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._buckets = LRUCache(maxsize=max_clients)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float) -> float:
+        """
+        Charge ``cost`` units to ``key``.
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the request would be allowed
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, 0.0))
+            tokens, wait = _take(tokens, updated, now, cost, self.rate, self.burst)
+            self._buckets[key] = (tokens, now)
+        return wait
+
+
+class SharedTokenBucketLimiter:
+    """
+    Token buckets shared by all gunicorn workers through a memory-mapped file.
+
+    Clients are hashed into a fixed table of ``slots`` buckets (colliding clients
+    share a bucket); each update takes a POSIX byte-range lock on its slot only,
+    so the per-request cost stays O(1) and workers rarely contend.
+    """
+
+    SLOT = struct.Struct("dd")  # tokens, last update (wall clock)
+
+    def __init__(self, path: str, rate_per_minute: float, burst: float, slots: int = 65536):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.slots = slots
+        size = slots * self.SLOT.size
+        import mmap
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mmap = mmap.mmap(self._fd, size)
+        # fcntl locks are per process, so threads of one worker also need a lock
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float) -> float:
+        """
+        Charge ``cost`` units to ``key``.
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the request would be allowed
+        """
+        offset = (zlib.crc32(key.encode("utf-8")) % self.slots) * self.SLOT.size
+        now = time.time()
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.SLOT.size, offset)
+            try:
+                tokens, updated = self.SLOT.unpack_from(self._mmap, offset)
+                tokens, wait = _take(tokens, updated, now, cost, self.rate, self.burst)
+                self.SLOT.pack_into(self._mmap, offset, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.SLOT.size, offset)
+        return wait
+
+
+def create_rate_limiter(rate_per_minute: float, burst: float, shared_path: str = ""):
+    """
+    Build the configured limiter, or None when rate limiting is disabled.
+
+    Args:
+        rate_per_minute: Units per minute per client; 0 or less disables limiting
+        burst: Bucket capacity in units; 0 or less uses ``rate_per_minute``
+        shared_path: File backing buckets shared across workers; empty keeps them in-process
+
+    Raises:
+        RuntimeError: If ``shared_path`` is set on a platform without fcntl (Windows)
+    """
+    if rate_per_minute <= 0:
+        return None
+    burst = burst if burst > 0 else rate_per_minute
+    if shared_path:
+        if fcntl is None:
+            raise RuntimeError("RATE_LIMIT_SHARED_PATH needs POSIX file locks (fcntl), which this platform lacks")
+        return SharedTokenBucketLimiter(shared_path, rate_per_minute, burst)
+    return TokenBucketLimiter(rate_per_minute, burst)
+
+
+def retry_after_seconds(wait: float) -> str:
+    """Format a wait time for the Retry-After header."""
+    return str(max(1, math.ceil(wait)))
@@ -0,0 +1,425 @@
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
+
+from api.accounting import ProcessCpuMeter, RequestUsage, peak_rss_bytes, split_batch_usage
+from api.deadline import DEFAULT_SECONDS_PER_UNIT, estimate_work
+from api.metrics import (
+    ADMISSION_REJECTIONS,
+    CANCELLED_REQUESTS,
+    LANE_LATENCY,
+    LANE_QUEUE_TIME,
+    QUEUE_DEPTH,
+    QUEUE_WORK,
+    WASTED_INFERENCE_SECONDS,
+    WASTED_WORK
+)
+from api.model_manager import ModelManager, ModelNotReadyError
+from api.profiling import InferenceProfiler
+from config.translation_config import TranslationConfig
+
+if TYPE_CHECKING:
+    from load_model import BatchStats
+
+logger = logging.getLogger(__name__)
+
+# Smoothing factor for the drain-rate and service-time moving averages
+DRAIN_RATE_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued (or expires in the queue)."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(f"Translation service overloaded ({reason})")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class LaneSpec:
+    """Scheduling parameters of one preset lane."""
+    max_batch_size: int
+    weight: float  # share of inference time relative to other busy lanes
+    max_concurrency: int  # inference workers the lane may occupy at once
+
+
+# Greedy traffic gets big batches and the largest share; 8-beam jobs are kept
+# to small batches on a single worker so they can never occupy every worker.
+DEFAULT_LANES = {
+    "fast": LaneSpec(max_batch_size=16, weight=4.0, max_concurrency=2),
+    "default": LaneSpec(max_batch_size=8, weight=2.0, max_concurrency=2),
+    "high_quality": LaneSpec(max_batch_size=2, weight=1.0, max_concurrency=1),
+}
+
+
+def parse_lane_specs(value: str) -> Dict[str, LaneSpec]:
+    """
+    Build lane specs from DEFAULT_LANES and a JSON override.
+
+    Args:
+        value: JSON object mapping lane names to LaneSpec fields, e.g.
+            '{"high_quality": {"max_batch_size": 4}}'; empty keeps the defaults
+
+    Returns:
+        Dict[str, LaneSpec]: Lane specs by preset name
+    """
+    specs = {name: LaneSpec(**spec.__dict__) for name, spec in DEFAULT_LANES.items()}
+    for name, overrides in (json.loads(value) if value else {}).items():
+        base = specs.get(name, DEFAULT_LANES["default"])
+        specs[name] = LaneSpec(**{**base.__dict__, **overrides})
+    return specs
+
+
+@dataclass(eq=False)
+class WorkItem:
+    """A translation waiting for, or running in, a batch."""
+    text: str
+    preset: str
+    config: TranslationConfig
+    cost: float  # estimated input tokens x beams
+    deadline: float  # time.monotonic() after which the result is useless
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    cancelled: threading.Event = field(default_factory=threading.Event)  # set when the client is gone
+
+
+class Lane:
+    """Queue and scheduling state of one preset."""
+
+    def __init__(self, name: str, spec: LaneSpec):
+        self.name = name
+        self.spec = spec
+        self.queue: Deque[WorkItem] = deque()
+        self.queued_work = 0.0
+        self.running = 0
+        self.seconds_per_unit: Optional[float] = None  # measured service time per work unit
+        self.recent_latency = 0.0  # moving average of enqueue-to-result seconds
+        # Weighted fair queuing: work served so far divided by the lane weight
+        self.virtual_time = 0.0
+
+    def eligible(self) -> bool:
+        return bool(self.queue) and self.running < self.spec.max_concurrency
+
+
+class InferenceScheduler:
+    """
+    Admission-controlled, per-preset scheduling lanes in front of the model.
+
+    Each preset has its own queue, batch size and concurrency limit. Inference
+    workers pick the eligible lane that has received the least service relative
+    to its weight, so a burst of 8-beam jobs can only ever hold its share of the
+    workers and ``fast`` requests never queue behind them.
+
+    The total queue is bounded by estimated work (input tokens x beams) rather
+    than request count. Requests that would overflow it, or that cannot start
+    before their deadline at the current drain rate, are rejected immediately
+    with a Retry-After estimate instead of waiting for the worker timeout.
+    """
+
+    def __init__(self, manager: ModelManager, lanes: Dict[str, LaneSpec], max_queue_work: float,
+                 default_timeout: float, workers: int = 2, profiler: Optional[InferenceProfiler] = None):
+        self.manager = manager
+        self.profiler = profiler
+        self.lanes = {name: Lane(name, spec) for name, spec in lanes.items()}
+        self.max_queue_work = max_queue_work
+        self.default_timeout = default_timeout
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self.queued_work = 0.0
+        self.worker_rate: Optional[float] = None  # work units per second of one busy worker
+        # Batch listeners run on the worker thread inside translate_batch, so each
+        # worker picks up the stats of its own batch from thread-local storage
+        self._local = threading.local()
+        self._cpu_meter = ProcessCpuMeter()
+        manager.batch_listeners.append(self._capture_batch_stats)
+
+    def start(self):
+        """Start the inference worker threads."""
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"inference-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def estimate_cost(self, text: str, config: TranslationConfig) -> float:
+        """Estimate the work of translating ``text`` with ``config``."""
+        return estimate_work(text, config)
+
+    def load_signals(self, preset: str) -> Tuple[float, float]:
+        """
+        Current load as seen by a preset's lane.
+
+        Returns:
+            Tuple[float, float]: Queued work as a fraction of max_queue_work, and the
+                lane's recent enqueue-to-result latency in seconds
+        """
+        lane = self.lanes.get(preset) or self.lanes["default"]
+        return self.queued_work / self.max_queue_work, lane.recent_latency
+
+    def estimate_lane(self, preset: str) -> Tuple[float, float]:
+        """
+        Estimate queueing and service time in a preset's lane.
+
+        Returns:
+            Tuple[float, float]: Seconds until a new item would start, and seconds per work unit
+        """
+        lane = self.lanes.get(preset) or self.lanes["default"]
+        seconds_per_unit = lane.seconds_per_unit or DEFAULT_SECONDS_PER_UNIT
+        wait = lane.queued_work * seconds_per_unit / max(1, min(lane.spec.max_concurrency, self.workers))
+        return wait, seconds_per_unit
+
+    @property
+    def drain_rate(self) -> Optional[float]:
+        """Work units per second drained with every worker busy, once measured."""
+        return self.worker_rate * self.workers if self.worker_rate else None
+
+    def estimated_wait(self, extra_work: float = 0.0) -> Optional[float]:
+        """Seconds until ``extra_work`` beyond the current queue would be drained, if known."""
+        if not self.drain_rate:
+            return None
+        return (self.queued_work + extra_work) / self.drain_rate
+
+    def _retry_after(self, excess_work: float) -> int:
+        if not self.drain_rate:
+            return 1
+        return max(1, math.ceil(excess_work / self.drain_rate))
+
+    def _reject(self, status_code: int, reason: str, retry_after: int):
+        ADMISSION_REJECTIONS.labels(reason=reason).inc()
+        raise AdmissionRejected(status_code, reason, retry_after)
+
+    def _update_gauges(self):
+        QUEUE_WORK.set(self.queued_work)
+        for lane in self.lanes.values():
+            QUEUE_DEPTH.labels(lane=lane.name).set(len(lane.queue))
+
+    async def submit(self, text: str, preset: str, config: TranslationConfig,
+                     timeout: Optional[float] = None) -> Tuple[str, str, RequestUsage]:
+        """
+        Queue a translation in its preset's lane and wait for the result.
+
+        Args:
+            text: Hindi text to translate
+            preset: Preset name, selecting the lane
+            config: Translation configuration to run
+            timeout: Seconds the caller is willing to wait; defaults to default_timeout
+
+        Returns:
+            Tuple[str, str, RequestUsage]: The translation, the model version that produced it
+                and the resources it consumed
+
+        Raises:
+            AdmissionRejected: If the request is shed or expires in the queue
+            ModelNotReadyError: If no model is loaded yet
+        """
+        if self.manager.current is None:
+            raise ModelNotReadyError("Translation service not ready")
+
+        timeout = timeout if timeout is not None else self.default_timeout
+        cost = self.estimate_cost(text, config)
+        loop = asyncio.get_running_loop()
+        item = WorkItem(
+            text=text,
+            preset=preset,
+            config=config,
+            cost=cost,
+            deadline=time.monotonic() + timeout,
+            loop=loop,
+            future=loop.create_future()
+        )
+
+        with self._cond:
+            excess = self.queued_work + cost - self.max_queue_work
+            if excess > 0 and self.queued_work > 0:
+                self._reject(503, "queue_full", self._retry_after(excess))
+
+            wait = self.estimated_wait()
+            if wait is not None and wait > timeout:
+                self._reject(503, "deadline", self._retry_after(self.queued_work))
+
+            lane = self.lanes.get(preset) or self.lanes["default"]
+            if not lane.queue and lane.running == 0:
+                # A lane returning from idle must not spend credit banked while idle
+                busy = [other.virtual_time for other in self.lanes.values() if other.queue or other.running]
+                lane.virtual_time = max([lane.virtual_time] + busy)
+
+            lane.queue.append(item)
+            lane.queued_work += cost
+            self.queued_work += cost
+            self._update_gauges()
+            self._cond.notify()
+
+        try:
+            return await item.future
+        except asyncio.CancelledError:
+            self.cancel(item)
+            raise
+
+    def cancel(self, item: WorkItem):
+        """
+        Abandon an item whose client has gone away.
+
+        A queued item is removed from its lane straight away; a running one is
+        skipped or stopped at the next decoding step of its generate call.
+        """
+        item.cancelled.set()
+        with self._cond:
+            lane = self.lanes.get(item.preset) or self.lanes["default"]
+            try:
+                lane.queue.remove(item)
+            except ValueError:
+                return  # already running or finished; _execute accounts for it
+            lane.queued_work = max(0.0, lane.queued_work - item.cost)
+            self.queued_work = max(0.0, self.queued_work - item.cost)
+            CANCELLED_REQUESTS.labels(lane=lane.name, stage="queued").inc()
+            self._update_gauges()
+
+    def _expire(self, lane: Lane, now: float):
+        """Drop items whose deadline passed while they were queued."""
+        live = deque()
+        for item in lane.queue:
+            if item.deadline <= now:
+                self.queued_work -= item.cost
+                lane.queued_work -= item.cost
+                ADMISSION_REJECTIONS.labels(reason="expired").inc()
+                self._resolve(item, error=AdmissionRejected(503, "expired", self._retry_after(self.queued_work)))
+            else:
+                live.append(item)
+        lane.queue = live
+
+    def _next_batch(self) -> Tuple[Lane, List[WorkItem]]:
+        """Wait for work and take a batch from the lane with the least weighted service."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for lane in self.lanes.values():
+                    self._expire(lane, now)
+
+                eligible = [lane for lane in self.lanes.values() if lane.eligible()]
+                if eligible:
+                    break
+                self._update_gauges()
+                self._cond.wait()
+
+            lane = min(eligible, key=lambda candidate: candidate.virtual_time)
+
+            # A batch shares one generate call, so it takes the oldest item plus
+            # queued items with the same configuration
+            batch = []
+            remaining = deque()
+            for item in lane.queue:
+                if len(batch) < lane.spec.max_batch_size and (not batch or item.config == batch[0].config):
+                    batch.append(item)
+                else:
+                    remaining.append(item)
+            lane.queue = remaining
+
+            work = sum(item.cost for item in batch)
+            self.queued_work = max(0.0, self.queued_work - work)
+            lane.queued_work = max(0.0, lane.queued_work - work)
+            lane.virtual_time += work / lane.spec.weight
+            lane.running += 1
+            self._update_gauges()
+            return lane, batch
+
+    def _run(self):
+        while True:
+            lane, batch = self._next_batch()
+            try:
+                self._execute(lane, batch)
+            finally:
+                with self._cond:
+                    lane.running -= 1
+                    self._cond.notify_all()
+
+    def _capture_batch_stats(self, stats: "BatchStats"):
+        self._local.batch_stats = stats
+
+    def _execute(self, lane: Lane, batch: List[WorkItem]):
+        start_time = time.perf_counter()
+        dequeued_at = time.monotonic()
+        queue_seconds = [dequeued_at - item.enqueued_at for item in batch]
+        for seconds in queue_seconds:
+            LANE_QUEUE_TIME.labels(lane=lane.name).observe(seconds)
+        self._local.batch_stats = None
+        cpu_batch = self._cpu_meter.start()
+        start_rss = peak_rss_bytes()
+
+        # Profiling hooks are only entered while an admin has turned profiling on
+        profiling = (
+            self.profiler.profile_batch(len(batch))
+            if self.profiler is not None and self.profiler.active else nullcontext()
+        )
+        try:
+            with self.manager.acquire() as handle, profiling:
+                translations = handle.translator.translate_batch(
+                    [item.text for item in batch],
+                    batch_size=lane.spec.max_batch_size,
+                    config=batch[0].config,
+                    cancelled=lambda index: batch[index].cancelled.is_set()
+                )
+                version = handle.version
+        except Exception as e:
+            self._cpu_meter.stop(cpu_batch)
+            logger.error(f"Batch translation failed: {str(e)}")
+            for item in batch:
+                self._resolve(item, error=e)
+            return
+
+        elapsed = time.perf_counter() - start_time
+        usages = split_batch_usage(
+            self._local.batch_stats, queue_seconds, elapsed,
+            self._cpu_meter.stop(cpu_batch), peak_rss_bytes() - start_rss
+        )
+        work = sum(item.cost for item in batch)
+        abandoned = [item for item in batch if item.cancelled.is_set()]
+        for item in abandoned:
+            CANCELLED_REQUESTS.labels(lane=lane.name, stage="running").inc()
+            WASTED_WORK.labels(lane=lane.name).inc(item.cost)
+            if work > 0:
+                WASTED_INFERENCE_SECONDS.labels(lane=lane.name).inc(elapsed * item.cost / work)
+
+        # Batches cut short by cancellation would skew the service-time estimates
+        if not abandoned and elapsed > 0 and work > 0:
+            rate = work / elapsed
+            with self._cond:
+                self.worker_rate = rate if self.worker_rate is None else (
+                    DRAIN_RATE_ALPHA * rate + (1 - DRAIN_RATE_ALPHA) * self.worker_rate
+                )
+                lane.seconds_per_unit = 1 / rate if lane.seconds_per_unit is None else (
+                    DRAIN_RATE_ALPHA / rate + (1 - DRAIN_RATE_ALPHA) * lane.seconds_per_unit
+                )
+
+        finished_at = time.monotonic()
+        for item, translation, usage in zip(batch, translations, usages):
+            if item.cancelled.is_set():
+                continue
+            latency = finished_at - item.enqueued_at
+            LANE_LATENCY.labels(lane=lane.name).observe(latency)
+            lane.recent_latency = DRAIN_RATE_ALPHA * latency + (1 - DRAIN_RATE_ALPHA) * lane.recent_latency
+            self._resolve(item, result=(translation, version, usage))
+
+    @staticmethod
+    def _resolve(item: WorkItem, result=None, error: Optional[Exception] = None):
+        """Complete an item's future from a worker thread."""
+        def complete():
+            if item.future.done():
+                return
+            if error is not None:
+                item.future.set_exception(error)
+            else:
+                item.future.set_result(result)
+
+        item.loop.call_soon_threadsafe(complete)
@@ -0,0 +1,63 @@
+import logging
+import time
+from typing import Dict, List
+
+from config.translation_config import PRESETS
+
+logger = logging.getLogger(__name__)
+
+# Representative Hindi sentence repeated to build warmup inputs of a given length
+WARMUP_SENTENCE = "भारत एक सुंदर देश है और यहाँ के लोग बहुत मेहनती हैं।"
+
+
+def build_warmup_text(translator, target_tokens: int) -> str:
+    """
+    Build a Hindi input of roughly ``target_tokens`` tokens.
+
+    Args:
+        translator: A loaded IndicTransModel
+        target_tokens (int): Desired input length in tokens
+
+    Returns:
+        str: Warmup text
+    """
+    # Warmup can run while requests are already being served; the fast
+    # tokenizer must not encode on two threads at once
+    with translator._tokenizer_lock:
+        sentence_tokens = len(translator.tokenizer(WARMUP_SENTENCE, add_special_tokens=False)["input_ids"])
+    repeats = max(1, round(target_tokens / max(1, sentence_tokens)))
+    return " ".join([WARMUP_SENTENCE] * repeats)
+
+
+def run_warmup(translator, presets: List[str], lengths: List[int], batch_sizes: List[int]) -> Dict[str, float]:
+    """
+    Run every preset at every input length and batch size once.
+
+    The first generate calls pay for allocator growth, kernel dispatch caches and
+    tokenizer warm paths; running them here keeps that cost off real requests.
+
+    Args:
+        translator: A loaded IndicTransModel
+        presets (List[str]): Preset names from PRESETS to warm up
+        lengths (List[int]): Input lengths in tokens
+        batch_sizes (List[int]): Batch sizes to run
+
+    Returns:
+        Dict[str, float]: Seconds spent per "preset/length/batch" combination
+    """
+    timings = {}
+    start_time = time.perf_counter()
+
+    for preset in presets:
+        if preset not in PRESETS:
+            logger.warning(f"Skipping warmup for unknown preset: {preset}")
+            continue
+        for length in lengths:
+            text = build_warmup_text(translator, length)
+            for batch_size in batch_sizes:
+                step_start = time.perf_counter()
+                translator.translate_batch([text] * batch_size, batch_size=batch_size, config=PRESETS[preset])
+                timings[f"{preset}/{length}/{batch_size}"] = time.perf_counter() - step_start
+
+    logger.info(f"Warmup finished: {len(timings)} runs in {time.perf_counter() - start_time:.2f}s")
+    return timings
@@ -14,6 +14,7 @@ class TranslationConfig:
     length_penalty: float = 1.0
     no_repeat_ngram_size: int = 3
     context_prompt: str = ""  # Prompt to guide the translation context
+    max_output_length: Optional[int] = None  # Shorter generation limit (deadlines); inputs still truncate at max_length
 
 # Default configuration
 DEFAULT_CONFIG = TranslationConfig(
@@ -55,4 +56,26 @@ HIGH_QUALITY_CONFIG = TranslationConfig(
     repetition_penalty=1.2,
     length_penalty=1.2,
     context_prompt="Translate this text with high accuracy and natural flow:"
-) 
\ No newline at end of file
+) 
+
+# Presets selectable by name through the API
+PRESETS = {
+    "default": DEFAULT_CONFIG,
+    "fast": FAST_CONFIG,
+    "high_quality": HIGH_QUALITY_CONFIG
+}
+
+def preset_name(config: TranslationConfig) -> str:
+    """
+    Name of the preset a configuration was derived from, or "custom".
+
+    Presets are told apart by their context prompt, which deadline degradation
+    and adaptive beam widths leave unchanged.
+    """
+    for name, preset in PRESETS.items():
+        if preset.context_prompt == config.context_prompt:
+            return name
+    return "custom"
+
+# Presets from most to least expensive, used to degrade requests that would miss their deadline
+DEGRADATION_ORDER = ["high_quality", "default", "fast"]
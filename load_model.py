@@ -1,9 +1,20 @@
 import logging
+import threading
+import time
 import torch
-from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+from dataclasses import dataclass
+from transformers import (
+    GenerationConfig,
+    MBartConfig,
+    MBartForConditionalGeneration,
+    MBart50TokenizerFast,
+    StoppingCriteria,
+    StoppingCriteriaList
+)
 from pathlib import Path
-from typing import Dict, Any, List, Union, Optional
-from utils.text_processing import clean_text, split_long_text
+from typing import Callable, Dict, Any, Iterable, Iterator, List, TextIO, Tuple, Union, Optional
+from utils.placeholders import PLACEHOLDER, mask_spans, restore_spans
+from utils.text_processing import DEFAULT_CHUNK_TOKENS, MAX_CHUNK_LENGTH, clean_text, iter_chunks, split_long_text
 from config.translation_config import TranslationConfig, DEFAULT_CONFIG
 
 # Configure logging
@@ -13,138 +24,529 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Stages timed by IndicTransModel and reported to its stage listeners
+STAGES = ("clean_text", "tokenize", "generate", "batch_decode")
+
+@dataclass
+class GenerateStats:
+    """Token accounting of one generate call."""
+    batch_size: int
+    padded_length: int  # input length every row is padded to
+    input_tokens: List[int]  # non-padding input tokens per row
+    output_tokens: List[int]  # generated tokens per row, excluding padding
+    decode_steps: int
+    seconds: float
+    tensor_bytes: int  # peak tensor memory: measured on CUDA, estimated on CPU
+
+    @property
+    def padding_ratio(self) -> float:
+        """Fraction of the padded input batch that is padding."""
+        return 1 - sum(self.input_tokens) / max(1, self.batch_size * self.padded_length)
+
+@dataclass
+class BatchStats:
+    """Token accounting of one ``translate_batch`` call, reported to batch listeners."""
+    config: TranslationConfig
+    input_tokens: List[int]  # per input text, summed over its chunks
+    output_tokens: List[int]
+    tensor_bytes: List[int]  # per input text: its rows' share of each generate call's peak
+    saved_input_tokens: List[int]  # per input text: encoder tokens placeholders saved
+    saved_output_tokens: List[int]  # per input text: decoder tokens saved by placeholders that came back
+    calls: List[GenerateStats]
+    seconds: float
+
+class CancellationCriteria(StoppingCriteria):
+    """Stops generation as soon as ``should_stop`` returns True; checked after every decoding step."""
+
+    def __init__(self, should_stop: Callable[[], bool]):
+        self.should_stop = should_stop
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        return self.should_stop()
+
 class IndicTransModel:
-    def __init__(self, device='cuda' if torch.cuda.is_available() else 'cpu'):
-        """Initialize the IndicTrans model and tokenizer."""
+    MODEL_NAME = "facebook/mbart-large-50-many-to-many-mmt"
+    PRECISIONS = ("fp32", "bf16", "fp16", "int8")
+
+    def __init__(self, device='cuda' if torch.cuda.is_available() else 'cpu',
+                 model_path: Optional[str] = None, offline: bool = False,
+                 precision: str = "fp32", mask_placeholders: bool = False):
+        """
+        Initialize the IndicTrans model and tokenizer.
+
+        Args:
+            device (str): Device to run the model on
+            model_path (Optional[str]): Hub name or local directory of the checkpoint
+                to load, e.g. one written by ``tools.trim_model``. Defaults to MODEL_NAME.
+            offline (bool): Never contact the Hugging Face hub, even for hub names
+            precision (str): One of PRECISIONS; "int8" applies dynamic quantization (CPU only)
+            mask_placeholders (bool): Replace URLs, emails, numbers and Latin-script spans
+                with placeholders before translation and restore them afterwards
+        """
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"Invalid precision. Must be one of: {list(self.PRECISIONS)}")
         self.device = device
         self.model = None
         self.tokenizer = None
-        self.MODEL_NAME = "facebook/mbart-large-50-many-to-many-mmt"
+        self.model_path = model_path or self.MODEL_NAME
+        self.offline = offline
+        self.precision = precision
+        self.mask_placeholders = mask_placeholders
         self.src_lang = "hi_IN"  # Source language: Hindi
         self.tgt_lang = "en_XX"  # Target language: English
         self.config = DEFAULT_CONFIG
+        # Fast tokenizers mutate padding/truncation state on every call, so
+        # concurrent batches must not encode at the same time
+        self._tokenizer_lock = threading.Lock()
+        # Called with (stage, seconds, config, chunks) after each stage in STAGES
+        self.stage_listeners: List[Callable[[str, float, TranslationConfig, int], None]] = []
+        # Called with a BatchStats after each translate_batch; token counting is skipped without listeners
+        self.batch_listeners: List[Callable[[BatchStats], None]] = []
 
     def load_model(self):
         """Load the IndicTrans model and tokenizer."""
         try:
-            logger.info("Downloading and loading the IndicTrans model...")
-            
-            # Load model and tokenizer
-            self.model = MBartForConditionalGeneration.from_pretrained(self.MODEL_NAME)
-            self.tokenizer = MBart50TokenizerFast.from_pretrained(self.MODEL_NAME)
+            start_time = time.perf_counter()
+            local_dir = Path(self.model_path)
+
+            if local_dir.is_dir():
+                # Pinned local artifacts never need the hub
+                logger.info(f"Loading the IndicTrans model from {local_dir}...")
+                self.model = self._load_local_model(local_dir)
+                self.tokenizer = MBart50TokenizerFast.from_pretrained(
+                    self.model_path, local_files_only=True
+                )
+            else:
+                logger.info("Downloading and loading the IndicTrans model...")
+                self.model = MBartForConditionalGeneration.from_pretrained(
+                    self.model_path, local_files_only=self.offline
+                )
+                self.tokenizer = MBart50TokenizerFast.from_pretrained(
+                    self.model_path, local_files_only=self.offline
+                )
             
             # Configure tokenizer
             self.tokenizer.src_lang = self.src_lang
             self.tokenizer.tgt_lang = self.tgt_lang
             
-            # Move model to device
-            self.model = self.model.to(self.device)
+            # Move model to device and apply the precision mode
+            self.model = self._apply_precision(self.model.to(self.device))
             
-            logger.info(f"Model loaded successfully on device: {self.device}")
+            logger.info(
+                f"Model loaded successfully on device: {self.device} ({self.precision}) "
+                f"in {time.perf_counter() - start_time:.2f}s"
+            )
             return True
             
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             return False
 
+    def _load_local_model(self, model_dir: Path) -> MBartForConditionalGeneration:
+        """
+        Load a model from a local directory, memory-mapping safetensors weights.
+
+        The model skeleton is built on the meta device and the weights are assigned
+        straight from the mmap-backed safetensors tensors, so nothing is deserialized
+        or copied on CPU. Directories without safetensors files, or whose weights do
+        not cover every parameter, fall back to ``from_pretrained``.
+
+        Args:
+            model_dir (Path): Local checkpoint directory
+
+        Returns:
+            MBartForConditionalGeneration: The loaded model in eval mode
+        """
+        weight_files = sorted(model_dir.glob("*.safetensors"))
+        if not weight_files:
+            return MBartForConditionalGeneration.from_pretrained(str(model_dir), local_files_only=True)
+
+        from safetensors.torch import load_file
+
+        config = MBartConfig.from_pretrained(str(model_dir), local_files_only=True)
+        with torch.device("meta"):
+            model = MBartForConditionalGeneration(config)
+
+        state_dict = {}
+        for weight_file in weight_files:
+            state_dict.update(load_file(str(weight_file)))
+        model.load_state_dict(state_dict, strict=False, assign=True)
+        model.tie_weights()
+
+        tensors = list(model.named_parameters()) + list(model.named_buffers())
+        missing = [name for name, tensor in tensors if tensor.is_meta]
+        if missing:
+            logger.warning(f"Weights missing from safetensors files ({missing[:3]}...), using from_pretrained")
+            return MBartForConditionalGeneration.from_pretrained(str(model_dir), local_files_only=True)
+
+        if any(p.dtype != torch.float32 for p in model.parameters() if p.is_floating_point()):
+            model = model.float()
+
+        try:
+            model.generation_config = GenerationConfig.from_pretrained(str(model_dir), local_files_only=True)
+        except OSError:
+            model.generation_config = GenerationConfig.from_model_config(config)
+
+        return model.eval()
+
+    def _apply_precision(self, model: MBartForConditionalGeneration) -> MBartForConditionalGeneration:
+        """Convert the model to the configured precision mode."""
+        if self.precision == "bf16":
+            return model.to(torch.bfloat16)
+        if self.precision == "fp16":
+            return model.to(torch.float16)
+        if self.precision == "int8":
+            return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
     def set_config(self, config: TranslationConfig):
         """Set translation configuration parameters."""
         self.config = config
-        logger.info("Translation configuration updated")
+        logger.debug("Translation configuration updated")
+
+    def _record_stage(self, stage: str, start_time: float, config: TranslationConfig, chunks: int) -> float:
+        """
+        Report a stage that started at ``start_time`` to the stage listeners.
+
+        Returns:
+            float: The current perf_counter reading, i.e. the start of the next stage
+        """
+        now = time.perf_counter()
+        for listener in self.stage_listeners:
+            listener(stage, now - start_time, config, chunks)
+        return now
 
-    def preprocess_text(self, text: str) -> Dict[str, torch.Tensor]:
+    def preprocess_text(self, text: str, config: Optional[TranslationConfig] = None) -> Dict[str, torch.Tensor]:
         """
         Preprocess input text for the IndicTrans model.
         
         Args:
             text (str): Input text to be translated
+            config (Optional[TranslationConfig]): Configuration to use instead of self.config
             
         Returns:
             Dict[str, torch.Tensor]: Tokenized and encoded input ready for the model
         """
+        return self.preprocess_batch([text], config)
+
+    def preprocess_batch(self, texts: List[str], config: Optional[TranslationConfig] = None) -> Dict[str, torch.Tensor]:
+        """
+        Preprocess a batch of input texts, padded to the longest one.
+        
+        Args:
+            texts (List[str]): Input texts to be translated
+            config (Optional[TranslationConfig]): Configuration to use instead of self.config
+            
+        Returns:
+            Dict[str, torch.Tensor]: Tokenized and encoded inputs ready for the model
+        """
+        config = config or self.config
         try:
             # Clean the input text
-            text = clean_text(text)
+            start_time = time.perf_counter()
+            texts = [clean_text(text) for text in texts]
             
             # Add context prompt if specified
-            if self.config.context_prompt:
-                text = f"{self.config.context_prompt}\n{text}"
+            if config.context_prompt:
+                texts = [f"{config.context_prompt}\n{text}" for text in texts]
+            start_time = self._record_stage("clean_text", start_time, config, len(texts))
             
             # Tokenize and encode the input text
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=self.config.max_length
-            )
+            with self._tokenizer_lock:
+                inputs = self.tokenizer(
+                    texts,
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=config.max_length
+                )
             
             # Move inputs to the selected device
             inputs = {key: value.to(self.device) for key, value in inputs.items()}
+            self._record_stage("tokenize", start_time, config, len(texts))
             return inputs
             
         except Exception as e:
             logger.error(f"Error preprocessing text: {str(e)}")
             raise
 
-    def translate_chunk(self, inputs: Dict[str, torch.Tensor]) -> str:
+    def translate_chunk(self, inputs: Dict[str, torch.Tensor], config: Optional[TranslationConfig] = None) -> str:
         """
         Translate a single chunk of text.
         
         Args:
             inputs (Dict[str, torch.Tensor]): Preprocessed input text
+            config (Optional[TranslationConfig]): Configuration to use instead of self.config
             
         Returns:
             str: Translated text
         """
+        return self.translate_chunks(inputs, config)[0]
+
+    def translate_chunks(self, inputs: Dict[str, torch.Tensor], config: Optional[TranslationConfig] = None,
+                         should_stop: Optional[Callable[[], bool]] = None) -> List[str]:
+        """
+        Translate a preprocessed batch of chunks with a single generate call.
+        
+        Args:
+            inputs (Dict[str, torch.Tensor]): Preprocessed input batch
+            config (Optional[TranslationConfig]): Configuration to use instead of self.config
+            should_stop (Optional[Callable[[], bool]]): Checked after every decoding step;
+                generation is abandoned (with truncated output) once it returns True
+            
+        Returns:
+            List[str]: Translated text for each row of the batch
+        """
+        return self._generate(inputs, config, should_stop)[0]
+
+    def _generate(self, inputs: Dict[str, torch.Tensor], config: Optional[TranslationConfig] = None,
+                  should_stop: Optional[Callable[[], bool]] = None) -> Tuple[List[str], Optional[GenerateStats]]:
+        """Run ``translate_chunks``, also returning token accounting when there are batch listeners."""
+        config = config or self.config
+        stopping_criteria = StoppingCriteriaList([CancellationCriteria(should_stop)]) if should_stop else None
+        chunks = inputs["input_ids"].shape[0]
+        measure_memory = bool(self.batch_listeners) and str(self.device).startswith("cuda")
         try:
+            if measure_memory:
+                torch.cuda.reset_peak_memory_stats(self.device)
+                baseline_bytes = torch.cuda.memory_allocated(self.device)
+            start_time = time.perf_counter()
             with torch.no_grad():
                 translated_tokens = self.model.generate(
                     **inputs,
-                    max_length=self.config.max_length,
-                    num_beams=self.config.num_beams,
-                    early_stopping=self.config.early_stopping,
-                    temperature=self.config.temperature,
-                    top_k=self.config.top_k,
-                    top_p=self.config.top_p,
-                    repetition_penalty=self.config.repetition_penalty,
-                    length_penalty=self.config.length_penalty,
-                    no_repeat_ngram_size=self.config.no_repeat_ngram_size,
-                    forced_bos_token_id=self.tokenizer.lang_code_to_id[self.tgt_lang]
+                    max_length=config.max_output_length or config.max_length,
+                    num_beams=config.num_beams,
+                    early_stopping=config.early_stopping,
+                    temperature=config.temperature,
+                    top_k=config.top_k,
+                    top_p=config.top_p,
+                    repetition_penalty=config.repetition_penalty,
+                    length_penalty=config.length_penalty,
+                    no_repeat_ngram_size=config.no_repeat_ngram_size,
+                    forced_bos_token_id=self.tokenizer.lang_code_to_id[self.tgt_lang],
+                    stopping_criteria=stopping_criteria
                 )
+            generate_time = time.perf_counter() - start_time
+            start_time = self._record_stage("generate", start_time, config, chunks)
             
-            return self.tokenizer.batch_decode(translated_tokens, skip_special_tokens=True)[0]
+            translations = self.tokenizer.batch_decode(translated_tokens, skip_special_tokens=True)
+            self._record_stage("batch_decode", start_time, config, chunks)
+
+            stats = None
+            if self.batch_listeners:
+                # The first output position is the decoder start token, not a decoding step
+                generated = translated_tokens[:, 1:]
+                padded_length = inputs["input_ids"].shape[1]
+                if measure_memory:
+                    tensor_bytes = torch.cuda.max_memory_allocated(self.device) - baseline_bytes
+                else:
+                    tensor_bytes = self._estimate_tensor_bytes(
+                        chunks, padded_length, generated.shape[1], config.num_beams
+                    )
+                stats = GenerateStats(
+                    batch_size=chunks,
+                    padded_length=padded_length,
+                    input_tokens=inputs["attention_mask"].sum(dim=1).tolist(),
+                    output_tokens=(generated != self.tokenizer.pad_token_id).sum(dim=1).tolist(),
+                    decode_steps=generated.shape[1],
+                    seconds=generate_time,
+                    tensor_bytes=tensor_bytes
+                )
+            return translations, stats
             
         except Exception as e:
             logger.error(f"Error translating chunk: {str(e)}")
             raise
 
-    def translate(self, text: str) -> str:
+    def _estimate_tensor_bytes(self, rows: int, input_length: int, output_length: int, num_beams: int) -> int:
+        """
+        Estimate the peak tensor memory of a generate call where no allocator statistics exist (CPU).
+
+        Counts what beam search keeps alive until its last step: the encoder
+        output, the self- and cross-attention key/value caches of every decoder
+        layer, and one step of vocabulary logits.
+        """
+        model_config = self.model.config
+        element_size = next(self.model.parameters()).element_size()
+        beams = rows * num_beams
+        elements = (
+            rows * input_length * model_config.d_model
+            + 2 * model_config.decoder_layers * beams * (input_length + output_length) * model_config.d_model
+            + beams * model_config.vocab_size
+        )
+        return elements * element_size
+
+    def translate(self, text: str, config: Optional[TranslationConfig] = None) -> str:
         """Translate text from Hindi to English."""
         if not self.model or not self.tokenizer:
             logger.error("Model or tokenizer not loaded")
             return None
             
         try:
-            # Split long text into chunks if necessary
-            text_chunks = split_long_text(text)
-            translations = []
-            
-            for chunk in text_chunks:
-                # Preprocess the text chunk
-                inputs = self.preprocess_text(chunk)
-                
-                # Translate the chunk
-                translation = self.translate_chunk(inputs)
-                translations.append(translation)
-            
-            # Join translations if there were multiple chunks
-            return " ".join(translations)
+            # Chunks of a single text are translated one at a time
+            return self.translate_batch([text], batch_size=1, config=config)[0]
             
         except Exception as e:
             logger.error(f"Error during translation: {str(e)}")
             return None
 
+    def translate_batch(self, texts: List[str], batch_size: int = 8,
+                        config: Optional[TranslationConfig] = None,
+                        cancelled: Optional[Callable[[int], bool]] = None,
+                        chunk_length: int = MAX_CHUNK_LENGTH) -> List[Optional[str]]:
+        """
+        Translate several texts, running up to ``batch_size`` chunks per generate call.
+        
+        Args:
+            texts (List[str]): Hindi texts to translate
+            batch_size (int): Maximum number of chunks per generate call
+            config (Optional[TranslationConfig]): Configuration to use instead of self.config
+            cancelled (Optional[Callable[[int], bool]]): Returns True once the translation of
+                ``texts[index]`` is no longer wanted. Its remaining chunks are skipped, and a
+                generate call is stopped early when every text in it has been cancelled.
+            chunk_length (int): Texts longer than this many characters are split into chunks
+            
+        Returns:
+            List[Optional[str]]: English translation for each input text, None if cancelled
+            
+        Raises:
+            RuntimeError: If the model is not loaded
+        """
+        if not self.model or not self.tokenizer:
+            raise RuntimeError("Model or tokenizer not loaded")
+
+        # Mask spans the model should copy verbatim; this also keeps URLs from being split at "?"
+        spans = [[] for _ in texts]
+        if self.mask_placeholders:
+            masked = [mask_spans(text) for text in texts]
+            texts = [text for text, _ in masked]
+            spans = [text_spans for _, text_spans in masked]
+
+        # Split long texts into chunks, remembering which text each chunk belongs to
+        chunks = []
+        owners = []
+        for index, text in enumerate(texts):
+            for chunk in split_long_text(text, chunk_length):
+                chunks.append(chunk)
+                owners.append(index)
+
+        start_time = time.perf_counter()
+        translations = [[] for _ in texts]
+        calls = []
+        input_tokens = [0] * len(texts)
+        output_tokens = [0] * len(texts)
+        tensor_bytes = [0] * len(texts)
+        for start in range(0, len(chunks), batch_size):
+            batch = [
+                (chunk, owner)
+                for chunk, owner in zip(chunks[start:start + batch_size], owners[start:start + batch_size])
+                if not (cancelled and cancelled(owner))
+            ]
+            if not batch:
+                continue
+
+            batch_owners = [owner for _, owner in batch]
+            should_stop = (lambda: all(cancelled(owner) for owner in batch_owners)) if cancelled else None
+            inputs = self.preprocess_batch([chunk for chunk, _ in batch], config)
+            chunk_translations, stats = self._generate(inputs, config, should_stop)
+            for owner, translation in zip(batch_owners, chunk_translations):
+                translations[owner].append(translation)
+
+            if stats is not None:
+                calls.append(stats)
+                for owner, tokens_in, tokens_out in zip(batch_owners, stats.input_tokens, stats.output_tokens):
+                    input_tokens[owner] += tokens_in
+                    output_tokens[owner] += tokens_out
+                    # Every row of a call is padded to the same length, so it holds an equal share
+                    tensor_bytes[owner] += stats.tensor_bytes // stats.batch_size
+
+        # Join translations if there were multiple chunks, then put the masked spans back
+        results = []
+        restored = []
+        for index, parts in enumerate(translations):
+            if cancelled and cancelled(index):
+                results.append(None)
+                restored.append([])
+            else:
+                translation, found = restore_spans(" ".join(parts), spans[index])
+                results.append(translation)
+                restored.append(found)
+
+        if calls:
+            saved_input_tokens, saved_output_tokens = self._placeholder_savings(spans, restored)
+            batch_stats = BatchStats(
+                config=config or self.config,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                tensor_bytes=tensor_bytes,
+                saved_input_tokens=saved_input_tokens,
+                saved_output_tokens=saved_output_tokens,
+                calls=calls,
+                seconds=time.perf_counter() - start_time
+            )
+            for listener in self.batch_listeners:
+                listener(batch_stats)
+
+        return results
+
+    def _placeholder_savings(self, spans: List[List[str]], restored: List[List[int]]) -> Tuple[List[int], List[int]]:
+        """
+        Tokens placeholders saved per text: each masked span's token count minus
+        its placeholder's, on the input side for every span, and on the output
+        side for the spans the model copied back (which it would otherwise have
+        generated token by token).
+        """
+        saved_input = [0] * len(spans)
+        saved_output = [0] * len(spans)
+        flat = [(owner, index, span) for owner, text_spans in enumerate(spans) for index, span in enumerate(text_spans)]
+        if not flat:
+            return saved_input, saved_output
+
+        strings = [span for _, _, span in flat] + [PLACEHOLDER.format(index) for _, index, _ in flat]
+        with self._tokenizer_lock:
+            lengths = [len(ids) for ids in self.tokenizer(strings, add_special_tokens=False)["input_ids"]]
+        for position, (owner, index, _) in enumerate(flat):
+            saved = lengths[position] - lengths[len(flat) + position]
+            saved_input[owner] += saved
+            if index in restored[owner]:
+                saved_output[owner] += saved
+        return saved_input, saved_output
+
+    def translate_stream(self, source: Union[TextIO, Iterable[str]], batch_size: int = 8,
+                         config: Optional[TranslationConfig] = None,
+                         max_tokens: int = DEFAULT_CHUNK_TOKENS) -> Iterator[str]:
+        """
+        Translate a document of any size lazily, chunk by chunk.
+        
+        The document is read incrementally with iter_chunks, and each group of
+        ``batch_size`` chunks is translated with one generate call as soon as it
+        has been read, so the first translations arrive before the rest of the
+        document is read and memory does not grow with its length.
+        
+        Args:
+            source (Union[TextIO, Iterable[str]]): Hindi text stream or iterable of lines
+            batch_size (int): Number of chunks per generate call
+            config (Optional[TranslationConfig]): Configuration to use instead of self.config
+            max_tokens (int): Estimated token budget of each chunk
+            
+        Yields:
+            str: English translation of each chunk, in document order
+            
+        Raises:
+            RuntimeError: If the model is not loaded
+        """
+        if not self.model or not self.tokenizer:
+            raise RuntimeError("Model or tokenizer not loaded")
+
+        batch = []
+        for chunk in iter_chunks(source, max_tokens):
+            batch.append(chunk)
+            if len(batch) == batch_size:
+                yield from self.translate_batch(batch, batch_size, config)
+                batch = []
+        if batch:
+            yield from self.translate_batch(batch, batch_size, config)
+
 def main():
     # Initialize and load model
     translator = IndicTransModel()
@@ -0,0 +1,94 @@
+import argparse
+import json
+import logging
+from dataclasses import replace
+from typing import Dict, List
+
+from load_model import IndicTransModel
+from config.translation_config import DEFAULT_CONFIG
+from tests.evaluate import evaluate_translation, run_evaluation
+from tests.test_data import TEST_CASES, DIFFICULTIES
+from utils.stats import percentile
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def measure_tradeoff(translator: IndicTransModel, beam_widths: List[int], repeats: int = 3) -> List[Dict]:
+    """
+    Measure quality and latency of each beam width per difficulty (input length) bucket.
+
+    Args:
+        translator: The IndicTransModel instance
+        beam_widths: Beam widths to evaluate
+        repeats: Timed runs per test case
+
+    Returns:
+        List[Dict]: One curve point per (beam width, difficulty)
+    """
+    points = []
+    for num_beams in beam_widths:
+        config = replace(DEFAULT_CONFIG, num_beams=num_beams)
+        # Quality from a batched pass; latency from unbatched requests, as the API serves them
+        quality = run_evaluation(translator, config=config).difficulty_results
+        translator.set_config(config)
+        for difficulty in DIFFICULTIES:
+            cases = [case for case in TEST_CASES if case.difficulty == difficulty]
+            latencies = [
+                evaluate_translation(translator, case).translation_time
+                for case in cases
+                for _ in range(repeats)
+            ]
+            scores = quality.get(difficulty)
+
+            points.append({
+                "num_beams": num_beams,
+                "difficulty": difficulty,
+                "cases": len(cases),
+                "bleu": scores.bleu if scores else 0.0,
+                "chrf": scores.chrf if scores else 0.0,
+                "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+                "p95_latency": percentile(latencies, 0.95),
+            })
+            logger.info(f"beams={num_beams} {difficulty}: {points[-1]}")
+    return points
+
+
+def print_tradeoff(points: List[Dict]):
+    """Print the trade-off curves in a readable format."""
+    print("\n=== Beam Width Quality/Latency Trade-off ===")
+    print(f"{'beams':>5} {'difficulty':>10} {'BLEU':>6} {'chrF':>6} {'mean (s)':>9} {'p95 (s)':>9}")
+    for point in points:
+        print(
+            f"{point['num_beams']:>5} {point['difficulty']:>10} {point['bleu']:>6.2f} {point['chrf']:>6.2f} "
+            f"{point['mean_latency']:>9.3f} {point['p95_latency']:>9.3f}"
+        )
+
+
+def main():
+    """Measure beam-width trade-off curves on the evaluation set."""
+    parser = argparse.ArgumentParser(description="Measure quality/latency trade-off of beam widths")
+    parser.add_argument("--beams", default="1,2,4,6,8", help="Comma-separated beam widths")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per test case")
+    parser.add_argument("--output", default="beam_tradeoff.json", help="JSON file to write the curves to")
+    args = parser.parse_args()
+
+    translator = IndicTransModel()
+    if not translator.load_model():
+        logger.error("Failed to load model")
+        return
+
+    points = measure_tradeoff(translator, [int(b) for b in args.beams.split(",")], args.repeats)
+    print_tradeoff(points)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(points, f, indent=2)
+    logger.info(f"Trade-off curves written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import argparse
+import json
+import logging
+import math
+import platform
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import torch
+
+from load_model import IndicTransModel, BatchStats
+from config.translation_config import PRESETS
+from tests.test_data import TEST_CASES
+from utils.stats import percentile
+from utils.text_processing import MAX_CHUNK_LENGTH
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Input-length buckets, in tokens per segment
+LENGTH_BUCKETS = {"short": 16, "medium": 64, "long": 256}
+
+# Compare mode: one-sided significance level and minimum median slowdown to flag
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_SLOWDOWN = 0.05
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one preset / batch size / length combination."""
+    preset: str
+    batch_size: int
+    length: str
+    input_tokens: int  # per batch
+    output_tokens: int  # per batch, averaged over trials
+    latencies: List[float]  # seconds per batch, one per trial
+    p50: float
+    p95: float
+    p99: float
+    mean: float
+    segments_per_second: float
+    tokens_per_second: float  # input plus output tokens
+    peak_rss_mb: float  # process peak so far
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def build_segments(translator: IndicTransModel, target_tokens: int, count: int) -> List[str]:
+    """
+    Build ``count`` distinct Hindi segments of roughly ``target_tokens`` tokens from the test sentences.
+
+    Args:
+        translator: A loaded IndicTransModel
+        target_tokens: Desired segment length in tokens
+        count: Number of segments
+
+    Returns:
+        List[str]: Segments, each starting from a different test sentence
+    """
+    sentences = [case.hindi for case in TEST_CASES]
+    lengths = [len(ids) for ids in translator.tokenizer(sentences, add_special_tokens=False)["input_ids"]]
+
+    segments = []
+    for offset in range(count):
+        parts = []
+        tokens = 0
+        index = offset
+        while tokens < target_tokens:
+            parts.append(sentences[index % len(sentences)])
+            tokens += lengths[index % len(sentences)]
+            index += 1
+        segments.append(" ".join(parts))
+    return segments
+
+def run_benchmark(translator: IndicTransModel, preset: str, batch_size: int, length: str,
+                  warmup: int, trials: int) -> BenchmarkResult:
+    """
+    Benchmark one combination: ``warmup`` untimed runs, then ``trials`` timed ones.
+
+    Args:
+        translator: A loaded IndicTransModel
+        preset: Preset name from PRESETS
+        batch_size: Segments per translate_batch call (all in one generate call; segments
+            are not split into chunks, whatever their length)
+        length: Key of LENGTH_BUCKETS
+        warmup: Untimed runs before measuring
+        trials: Timed runs
+
+    Returns:
+        BenchmarkResult: Latency percentiles and throughput
+    """
+    config = PRESETS[preset]
+    segments = build_segments(translator, LENGTH_BUCKETS[length], batch_size)
+    # "long" segments exceed split_long_text's default; keep each one a single row
+    chunk_length = max(MAX_CHUNK_LENGTH, max(len(segment) for segment in segments))
+
+    for _ in range(warmup):
+        translator.translate_batch(segments, batch_size=batch_size, config=config, chunk_length=chunk_length)
+
+    batches: List[BatchStats] = []
+    listener = batches.append
+    translator.batch_listeners.append(listener)
+    latencies = []
+    try:
+        for _ in range(trials):
+            start_time = time.perf_counter()
+            translator.translate_batch(segments, batch_size=batch_size, config=config, chunk_length=chunk_length)
+            latencies.append(time.perf_counter() - start_time)
+    finally:
+        translator.batch_listeners.remove(listener)
+
+    total_time = sum(latencies)
+    input_tokens = sum(batches[0].input_tokens) if batches else 0
+    output_tokens = sum(sum(stats.output_tokens) for stats in batches)
+    return BenchmarkResult(
+        preset=preset,
+        batch_size=batch_size,
+        length=length,
+        input_tokens=input_tokens,
+        output_tokens=round(output_tokens / max(1, len(batches))),
+        latencies=latencies,
+        p50=percentile(latencies, 0.50),
+        p95=percentile(latencies, 0.95),
+        p99=percentile(latencies, 0.99),
+        mean=total_time / len(latencies),
+        segments_per_second=batch_size * trials / total_time,
+        tokens_per_second=(input_tokens * trials + output_tokens) / total_time,
+        peak_rss_mb=peak_rss_mb()
+    )
+
+def run_sweep(translator: IndicTransModel, presets: List[str], batch_sizes: List[int], lengths: List[str],
+              warmup: int, trials: int) -> List[BenchmarkResult]:
+    """Benchmark every preset x batch size x length combination."""
+    results = []
+    for preset in presets:
+        for length in lengths:
+            for batch_size in batch_sizes:
+                result = run_benchmark(translator, preset, batch_size, length, warmup, trials)
+                logger.info(
+                    f"{preset}/{length}/{batch_size}: p50={result.p50:.3f}s p95={result.p95:.3f}s "
+                    f"{result.segments_per_second:.2f} seg/s {result.tokens_per_second:.1f} tok/s"
+                )
+                results.append(result)
+    return results
+
+def mann_whitney_u(baseline: List[float], candidate: List[float]) -> float:
+    """
+    One-sided Mann-Whitney U test that ``candidate`` tends to be larger than ``baseline``.
+
+    Uses the normal approximation with tie and continuity corrections, which is
+    reasonable from about 8 samples per side.
+
+    Returns:
+        float: p-value
+    """
+    n1, n2 = len(baseline), len(candidate)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    # Rank the pooled samples, averaging the ranks of ties
+    pooled = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    start = 0
+    while start < len(pooled):
+        end = start
+        while end + 1 < len(pooled) and pooled[end + 1][0] == pooled[start][0]:
+            end += 1
+        for index in range(start, end + 1):
+            ranks[index] = (start + end) / 2 + 1
+        tied = end - start + 1
+        tie_term += tied ** 3 - tied
+        start = end + 1
+
+    candidate_ranks = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 1)
+    u = candidate_ranks - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def compare_results(baseline: Dict, candidate: Dict, alpha: float = DEFAULT_ALPHA,
+                    min_slowdown: float = DEFAULT_MIN_SLOWDOWN) -> List[Dict]:
+    """
+    Compare two benchmark result files combination by combination.
+
+    A combination regresses when its latencies are significantly larger
+    (Mann-Whitney U, p < ``alpha``) and its median is at least ``min_slowdown`` slower.
+
+    Returns:
+        List[Dict]: One comparison per combination present in both files
+    """
+    def key(result: Dict) -> Tuple[str, int, str]:
+        return result["preset"], result["batch_size"], result["length"]
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    comparisons = []
+    for result in candidate["results"]:
+        base = baseline_results.get(key(result))
+        if base is None:
+            continue
+        change = result["p50"] / base["p50"] - 1 if base["p50"] > 0 else 0.0
+        p_value = mann_whitney_u(base["latencies"], result["latencies"])
+        comparisons.append({
+            "preset": result["preset"],
+            "batch_size": result["batch_size"],
+            "length": result["length"],
+            "baseline_p50": base["p50"],
+            "candidate_p50": result["p50"],
+            "change": change,
+            "p_value": p_value,
+            "regression": p_value < alpha and change >= min_slowdown
+        })
+    return comparisons
+
+def print_results(results: List[BenchmarkResult]):
+    """Print benchmark results in a readable format."""
+    print("\n=== Benchmark Results ===")
+    print(f"{'preset':>12} {'length':>6} {'batch':>5} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} "
+          f"{'seg/s':>8} {'tok/s':>9} {'RSS MB':>8}")
+    for result in results:
+        print(f"{result.preset:>12} {result.length:>6} {result.batch_size:>5} {result.p50:>8.3f} "
+              f"{result.p95:>8.3f} {result.p99:>8.3f} {result.segments_per_second:>8.2f} "
+              f"{result.tokens_per_second:>9.1f} {result.peak_rss_mb:>8.0f}")
+
+def print_comparison(comparisons: List[Dict]):
+    """Print a comparison, marking regressions."""
+    print("\n=== Benchmark Comparison ===")
+    for comparison in comparisons:
+        flag = "REGRESSION" if comparison["regression"] else ""
+        print(f"{comparison['preset']:>12} {comparison['length']:>6} {comparison['batch_size']:>5} "
+              f"{comparison['baseline_p50']:>8.3f} -> {comparison['candidate_p50']:>8.3f} "
+              f"({comparison['change'] * 100:+6.1f}%, p={comparison['p_value']:.4f}) {flag}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark sweep, or compare two result files."""
+    parser = argparse.ArgumentParser(description="Latency and throughput benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Sweep presets x batch sizes x input lengths")
+    run_parser.add_argument("--presets", default=",".join(PRESETS), help="Comma-separated preset names")
+    run_parser.add_argument("--batch-sizes", default="1,4,8", help="Comma-separated batch sizes")
+    run_parser.add_argument("--lengths", default=",".join(LENGTH_BUCKETS), help="Comma-separated length buckets")
+    run_parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per combination")
+    run_parser.add_argument("--trials", type=int, default=10, help="Timed runs per combination")
+    run_parser.add_argument("--model-path", default=None, help="Checkpoint to benchmark (default: hub model)")
+    run_parser.add_argument("--precision", default="fp32", choices=IndicTransModel.PRECISIONS)
+    run_parser.add_argument("--output", default="benchmark.json", help="JSON file to write results to")
+
+    compare_parser = subparsers.add_parser("compare", help="Flag significant regressions between two runs")
+    compare_parser.add_argument("baseline", help="Baseline result file")
+    compare_parser.add_argument("candidate", help="Candidate result file")
+    compare_parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Significance level")
+    compare_parser.add_argument("--min-slowdown", type=float, default=DEFAULT_MIN_SLOWDOWN,
+                                help="Minimum relative p50 increase to flag")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.candidate, encoding="utf-8") as f:
+            candidate = json.load(f)
+        comparisons = compare_results(baseline, candidate, args.alpha, args.min_slowdown)
+        print_comparison(comparisons)
+        # Non-zero exit status so CI fails on regressions
+        return 1 if any(comparison["regression"] for comparison in comparisons) else 0
+
+    translator = IndicTransModel(model_path=args.model_path, precision=args.precision)
+    if not translator.load_model():
+        logger.error("Failed to load model")
+        return 1
+
+    results = run_sweep(
+        translator,
+        presets=args.presets.split(","),
+        batch_sizes=[int(size) for size in args.batch_sizes.split(",")],
+        lengths=args.lengths.split(","),
+        warmup=args.warmup,
+        trials=args.trials
+    )
+    print_results(results)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "metadata": {
+                "timestamp": datetime.now().isoformat(),
+                "model_path": translator.model_path,
+                "precision": args.precision,
+                "device": translator.device,
+                "torch_version": torch.__version__,
+                "torch_threads": torch.get_num_threads(),
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+                "warmup": args.warmup,
+                "trials": args.trials
+            },
+            "results": [asdict(result) for result in results]
+        }, f, indent=2)
+    logger.info(f"Benchmark results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,19 @@
+import argparse
+import os
+import sys
 import time
 import logging
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+from typing import Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+import torch
 from load_model import IndicTransModel
-from config.translation_config import DEFAULT_CONFIG, FAST_CONFIG, HIGH_QUALITY_CONFIG
-from tests.test_data import TestCase, TEST_CASES, EXPECTED_TIMES, CATEGORIES, DIFFICULTIES
+from config.translation_config import PRESETS, TranslationConfig, DEFAULT_CONFIG, FAST_CONFIG, HIGH_QUALITY_CONFIG
+from tests.scoring import ScoreStats, sentence_chrf
+from tests.slo import check_slos, host_scale, print_slo_results
+from tests.test_data import TestCase, TEST_CASES, iter_test_cases
 
 # Configure logging
 logging.basicConfig(
@@ -13,157 +22,302 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Test cases per translate_batch call, and the number of lowest-scoring cases to report
+DEFAULT_BATCH_SIZE = 16
+WORST_CASES = 10
+# Test cases read and length-sorted at a time when streaming a corpus
+DEFAULT_WINDOW = 1024
+# Batches between progress log lines of a streaming evaluation
+PROGRESS_INTERVAL = 50
+
 @dataclass
 class TestResult:
     """Results of a single test case."""
     test_case: TestCase
     translation: str
     translation_time: float
-    is_correct: bool
+    chrf: float  # sentence-level chrF against the reference
     error_message: str = ""
 
 @dataclass
 class EvaluationResults:
-    """Aggregated evaluation results."""
-    total_tests: int
-    correct_translations: int
-    average_time: float
-    category_results: Dict[str, Dict[str, int]]
-    difficulty_results: Dict[str, Dict[str, int]]
-    failed_cases: List[TestResult]
+    """Aggregated evaluation results; built incrementally and mergeable across shards."""
+    total_tests: int = 0
+    scores: ScoreStats = field(default_factory=ScoreStats)
+    total_time: float = 0.0  # summed per-case translation time
+    category_results: Dict[str, ScoreStats] = field(default_factory=dict)
+    difficulty_results: Dict[str, ScoreStats] = field(default_factory=dict)
+    worst_cases: List[TestResult] = field(default_factory=list)  # lowest sentence chrF first
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.total_tests if self.total_tests > 0 else 0
+
+    def add(self, result: TestResult, worst: int = WORST_CASES):
+        """Add one test result."""
+        case = result.test_case
+        self.total_tests += 1
+        self.total_time += result.translation_time
+        self.scores.add(result.translation, case.english)
+        self.category_results.setdefault(case.category, ScoreStats()).add(result.translation, case.english)
+        self.difficulty_results.setdefault(case.difficulty, ScoreStats()).add(result.translation, case.english)
+        if len(self.worst_cases) < worst or result.chrf < self.worst_cases[-1].chrf:
+            self.worst_cases = sorted(self.worst_cases + [result], key=lambda item: item.chrf)[:worst]
+
+    def merge(self, other: "EvaluationResults", worst: int = WORST_CASES):
+        """Add the results of another shard to these."""
+        self.total_tests += other.total_tests
+        self.total_time += other.total_time
+        self.scores.merge(other.scores)
+        for mine, theirs in ((self.category_results, other.category_results),
+                             (self.difficulty_results, other.difficulty_results)):
+            for key, stats in theirs.items():
+                mine.setdefault(key, ScoreStats()).merge(stats)
+        self.worst_cases = sorted(self.worst_cases + other.worst_cases, key=lambda item: item.chrf)[:worst]
 
 def evaluate_translation(translator: IndicTransModel, test_case: TestCase) -> TestResult:
     """
     Evaluate a single test case.
-    
+
     Args:
         translator: The IndicTransModel instance
         test_case: The test case to evaluate
-        
+
     Returns:
         TestResult: Results of the evaluation
     """
     try:
-        start_time = time.time()
-        translation = translator.translate(test_case.hindi)
-        translation_time = time.time() - start_time
-        
-        # Simple correctness check (can be enhanced with more sophisticated metrics)
-        is_correct = translation.lower().strip() == test_case.english.lower().strip()
-        
+        start_time = time.perf_counter()
+        translation = translator.translate(test_case.hindi) or ""
+        translation_time = time.perf_counter() - start_time
+
         return TestResult(
             test_case=test_case,
             translation=translation,
             translation_time=translation_time,
-            is_correct=is_correct
+            chrf=sentence_chrf(translation, test_case.english)
         )
-        
+
     except Exception as e:
         logger.error(f"Error evaluating test case: {str(e)}")
         return TestResult(
             test_case=test_case,
             translation="",
             translation_time=0,
-            is_correct=False,
+            chrf=0.0,
             error_message=str(e)
         )
 
-def run_evaluation(translator: IndicTransModel) -> EvaluationResults:
+def translate_cases(translator: IndicTransModel, test_cases: List[TestCase], batch_size: int = DEFAULT_BATCH_SIZE,
+                    config: Optional[TranslationConfig] = None) -> List[TestResult]:
+    """
+    Translate test cases in batches and score each one.
+
+    Cases are batched in order of input length, so each generate call pads as
+    little as possible; each case is charged an equal share of its batch's time.
+
+    Returns:
+        List[TestResult]: One result per test case, in input order
+    """
+    order = sorted(range(len(test_cases)), key=lambda index: len(test_cases[index].hindi))
+    results: List[Optional[TestResult]] = [None] * len(test_cases)
+
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        batch = [test_cases[index] for index in indices]
+        error_message = ""
+        start_time = time.perf_counter()
+        try:
+            translations = translator.translate_batch(
+                [case.hindi for case in batch], batch_size=batch_size, config=config
+            )
+        except Exception as e:
+            logger.error(f"Error evaluating batch: {str(e)}")
+            translations = [""] * len(batch)
+            error_message = str(e)
+        share = (time.perf_counter() - start_time) / len(batch)
+
+        for index, case, translation in zip(indices, batch, translations):
+            results[index] = TestResult(
+                test_case=case,
+                translation=translation or "",
+                translation_time=share,
+                chrf=sentence_chrf(translation or "", case.english),
+                error_message=error_message
+            )
+    return results
+
+def summarize_results(results: List[TestResult], worst: int = WORST_CASES) -> EvaluationResults:
+    """Aggregate test results into corpus BLEU/chrF overall, by category and by difficulty."""
+    summary = EvaluationResults()
+    for result in results:
+        summary.add(result, worst)
+    return summary
+
+def run_evaluation(translator: IndicTransModel, test_cases: List[TestCase] = TEST_CASES,
+                   batch_size: int = DEFAULT_BATCH_SIZE,
+                   config: Optional[TranslationConfig] = None) -> EvaluationResults:
     """
     Run a complete evaluation of the translation model.
-    
+
     Args:
         translator: The IndicTransModel instance
-        
+        test_cases: Test cases to evaluate
+        batch_size: Test cases per translate_batch call
+        config: Configuration to use instead of the translator's own
+
     Returns:
         EvaluationResults: Aggregated evaluation results
     """
-    results = []
-    total_time = 0
-    
-    # Initialize category and difficulty counters
-    category_results = {cat: {"total": 0, "correct": 0} for cat in CATEGORIES}
-    difficulty_results = {diff: {"total": 0, "correct": 0} for diff in DIFFICULTIES}
-    
-    # Run all test cases
-    for test_case in TEST_CASES:
-        result = evaluate_translation(translator, test_case)
-        results.append(result)
-        
-        # Update statistics
-        total_time += result.translation_time
-        category_results[test_case.category]["total"] += 1
-        difficulty_results[test_case.difficulty]["total"] += 1
-        
-        if result.is_correct:
-            category_results[test_case.category]["correct"] += 1
-            difficulty_results[test_case.difficulty]["correct"] += 1
-    
-    # Calculate final statistics
-    total_tests = len(results)
-    correct_translations = sum(1 for r in results if r.is_correct)
-    average_time = total_time / total_tests if total_tests > 0 else 0
-    
-    return EvaluationResults(
-        total_tests=total_tests,
-        correct_translations=correct_translations,
-        average_time=average_time,
-        category_results=category_results,
-        difficulty_results=difficulty_results,
-        failed_cases=[r for r in results if not r.is_correct]
+    return summarize_results(translate_cases(translator, test_cases, batch_size, config))
+
+def evaluate_stream(translator: IndicTransModel, test_cases: Iterable[TestCase],
+                    batch_size: int = DEFAULT_BATCH_SIZE, config: Optional[TranslationConfig] = None,
+                    window: int = DEFAULT_WINDOW) -> EvaluationResults:
+    """
+    Evaluate a stream of test cases of any length with bounded memory.
+
+    Cases are read ``window`` at a time, translated in length-sorted batches
+    and folded into the results, so only one window and the worst cases are
+    kept at a time.
+    """
+    summary = EvaluationResults()
+    test_cases = iter(test_cases)
+    batches = 0
+    while True:
+        chunk = list(islice(test_cases, window))
+        if not chunk:
+            break
+        for result in translate_cases(translator, chunk, batch_size, config):
+            summary.add(result)
+
+        previous = batches
+        batches += -(-len(chunk) // batch_size)
+        if batches // PROGRESS_INTERVAL > previous // PROGRESS_INTERVAL:
+            logger.info(f"Evaluated {summary.total_tests} test cases, chrF so far {summary.scores.chrf:.2f}")
+    return summary
+
+def evaluate_shard(path: str, shard: int, num_shards: int, preset: str, model_path: Optional[str] = None,
+                   precision: str = "fp32", batch_size: int = DEFAULT_BATCH_SIZE,
+                   threads: Optional[int] = None) -> EvaluationResults:
+    """
+    Evaluate one shard of a corpus file with its own model replica.
+
+    Runs in a worker process: loads the model, streams every ``num_shards``-th
+    case of ``path`` starting at ``shard`` and returns the shard's results.
+    """
+    if threads:
+        torch.set_num_threads(threads)
+    translator = IndicTransModel(model_path=model_path, precision=precision)
+    if not translator.load_model():
+        raise RuntimeError(f"Shard {shard}: failed to load model")
+    return evaluate_stream(
+        translator, iter_test_cases(path, shard, num_shards), batch_size=batch_size, config=PRESETS[preset]
     )
 
+def run_sharded_evaluation(path: str, preset: str, workers: int = 1, model_path: Optional[str] = None,
+                           precision: str = "fp32", batch_size: int = DEFAULT_BATCH_SIZE) -> EvaluationResults:
+    """
+    Evaluate a TSV/JSONL corpus across ``workers`` processes and merge their results.
+
+    Each worker loads a model replica and reads its own shard of the file, so
+    no test data crosses process boundaries; CPU threads are split evenly
+    between workers.
+
+    Returns:
+        EvaluationResults: Results of the whole corpus
+    """
+    if workers <= 1:
+        return evaluate_shard(path, 0, 1, preset, model_path, precision, batch_size)
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    summary = EvaluationResults()
+    # Spawned rather than forked workers, so no torch thread pools or locks are inherited
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+        futures = [
+            executor.submit(evaluate_shard, path, shard, workers, preset, model_path, precision, batch_size, threads)
+            for shard in range(workers)
+        ]
+        for future in futures:
+            summary.merge(future.result())
+    return summary
+
 def print_evaluation_results(results: EvaluationResults):
     """Print evaluation results in a readable format."""
     print("\n=== Translation Evaluation Results ===")
     print(f"Total Tests: {results.total_tests}")
-    print(f"Correct Translations: {results.correct_translations}")
-    print(f"Accuracy: {(results.correct_translations / results.total_tests * 100):.2f}%")
+    print(f"BLEU: {results.scores.bleu:.2f}")
+    print(f"chrF: {results.scores.chrf:.2f}")
     print(f"Average Translation Time: {results.average_time:.3f} seconds")
-    
+
     print("\n=== Results by Category ===")
     for category, stats in results.category_results.items():
-        accuracy = (stats["correct"] / stats["total"] * 100) if stats["total"] > 0 else 0
-        print(f"{category.capitalize()}: {stats['correct']}/{stats['total']} ({accuracy:.2f}%)")
-    
+        print(f"{category.capitalize()}: BLEU {stats.bleu:.2f}, chrF {stats.chrf:.2f} ({stats.sentences} tests)")
+
     print("\n=== Results by Difficulty ===")
     for difficulty, stats in results.difficulty_results.items():
-        accuracy = (stats["correct"] / stats["total"] * 100) if stats["total"] > 0 else 0
-        print(f"{difficulty.capitalize()}: {stats['correct']}/{stats['total']} ({accuracy:.2f}%)")
-    
-    if results.failed_cases:
-        print("\n=== Failed Cases ===")
-        for case in results.failed_cases:
+        print(f"{difficulty.capitalize()}: BLEU {stats.bleu:.2f}, chrF {stats.chrf:.2f} ({stats.sentences} tests)")
+
+    if results.worst_cases:
+        print("\n=== Lowest-Scoring Cases ===")
+        for case in results.worst_cases:
             print(f"\nInput: {case.test_case.hindi}")
             print(f"Expected: {case.test_case.english}")
-            print(f"Got: {case.translation}")
+            print(f"Got: {case.translation} (chrF {case.chrf:.1f})")
             if case.error_message:
                 print(f"Error: {case.error_message}")
 
-def main():
-    """Run the evaluation with different configurations."""
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the evaluation with different configurations, then check latency SLOs."""
+    parser = argparse.ArgumentParser(description="Translation quality evaluation")
+    parser.add_argument("--data", default=None,
+                        help="TSV or JSONL corpus to evaluate instead of the built-in test cases")
+    parser.add_argument("--presets", default=",".join(PRESETS), help="Comma-separated presets for --data")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with a model replica")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Test cases per batch")
+    parser.add_argument("--model-path", default=None, help="Checkpoint to evaluate (default: hub model)")
+    parser.add_argument("--precision", default="fp32", choices=IndicTransModel.PRECISIONS)
+    args = parser.parse_args(argv)
+
+    if args.data:
+        for preset in args.presets.split(","):
+            print(f"\n=== Evaluating {args.data} with the {preset} preset ===")
+            start_time = time.perf_counter()
+            results = run_sharded_evaluation(
+                args.data, preset, workers=args.workers, model_path=args.model_path,
+                precision=args.precision, batch_size=args.batch_size
+            )
+            print_evaluation_results(results)
+            print(f"Wall time: {time.perf_counter() - start_time:.1f} seconds")
+        return 0
+
     # Initialize translator
-    translator = IndicTransModel()
+    translator = IndicTransModel(model_path=args.model_path, precision=args.precision)
     if not translator.load_model():
         logger.error("Failed to load model")
-        return
-    
+        return 1
+
     # Test with default configuration
     print("\n=== Testing with Default Configuration ===")
-    results = run_evaluation(translator)
+    results = run_evaluation(translator, config=DEFAULT_CONFIG)
     print_evaluation_results(results)
-    
+
     # Test with fast configuration
     print("\n=== Testing with Fast Configuration ===")
-    translator.set_config(FAST_CONFIG)
-    results = run_evaluation(translator)
+    results = run_evaluation(translator, config=FAST_CONFIG)
     print_evaluation_results(results)
-    
+
     # Test with high quality configuration
     print("\n=== Testing with High Quality Configuration ===")
-    translator.set_config(HIGH_QUALITY_CONFIG)
-    results = run_evaluation(translator)
+    results = run_evaluation(translator, config=HIGH_QUALITY_CONFIG)
     print_evaluation_results(results)
 
+    # Check latency per preset and difficulty, with budgets scaled to this host's speed
+    scale = host_scale(translator.device)
+    slo_results = check_slos(translator, ["default", "fast", "high_quality"], scale=scale)
+    print_slo_results(slo_results, scale)
+    # Non-zero exit status so CI fails on latency regressions
+    return 0 if all(result.passed for result in slo_results) else 1
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
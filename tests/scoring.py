@@ -0,0 +1,155 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# BLEU word n-gram orders and chrF character n-gram orders
+BLEU_ORDER = 4
+CHRF_ORDER = 6
+CHRF_BETA = 2  # recall weighted twice as much as precision
+
+# Tokenization rules of the standard "13a" (mteval-v13a) BLEU tokenizer
+_13A_RULES = [
+    (re.compile(r"([\{-\~\[-\` -\&\(-\+\:-\@\/])"), r" \1 "),
+    (re.compile(r"([^0-9])([\.,])"), r"\1 \2 "),
+    (re.compile(r"([\.,])([^0-9])"), r" \1 \2"),
+    (re.compile(r"([0-9])(-)"), r"\1 \2 "),
+]
+
+def tokenize_13a(text: str) -> List[str]:
+    """Split text into BLEU tokens with the 13a rules."""
+    text = text.replace("&quot;", '"').replace("&amp;", "&").replace("&lt;", "<").replace("&gt;", ">")
+    text = f" {text} "
+    for pattern, replacement in _13A_RULES:
+        text = pattern.sub(replacement, text)
+    return text.split()
+
+def ngram_counts(items, order: int) -> Counter:
+    """Count the n-grams of one order in a token list or string."""
+    return Counter(zip(*[items[i:] for i in range(order)]))
+
+@dataclass
+class BleuStats:
+    """Sufficient statistics of corpus BLEU; sums over sentences and merges across shards."""
+    matches: List[int] = field(default_factory=lambda: [0] * BLEU_ORDER)  # clipped n-gram matches per order
+    totals: List[int] = field(default_factory=lambda: [0] * BLEU_ORDER)  # hypothesis n-grams per order
+    hyp_length: int = 0
+    ref_length: int = 0
+
+    def add(self, hypothesis: str, reference: str):
+        """Add one sentence pair."""
+        hyp_tokens = tokenize_13a(hypothesis)
+        ref_tokens = tokenize_13a(reference)
+        self.hyp_length += len(hyp_tokens)
+        self.ref_length += len(ref_tokens)
+        for n in range(1, BLEU_ORDER + 1):
+            hyp_ngrams = ngram_counts(hyp_tokens, n)
+            self.matches[n - 1] += sum((hyp_ngrams & ngram_counts(ref_tokens, n)).values())
+            self.totals[n - 1] += max(0, len(hyp_tokens) - n + 1)
+
+    def merge(self, other: "BleuStats"):
+        """Add another set of statistics to this one."""
+        self.matches = [a + b for a, b in zip(self.matches, other.matches)]
+        self.totals = [a + b for a, b in zip(self.totals, other.totals)]
+        self.hyp_length += other.hyp_length
+        self.ref_length += other.ref_length
+
+    def score(self) -> float:
+        """
+        Corpus BLEU (0-100) with the brevity penalty and sacrebleu's default
+        exponential smoothing: the k-th order without matches gets precision
+        1 / (2^k * total), so small buckets do not collapse to 0.
+        """
+        if self.hyp_length == 0 or not any(self.matches):
+            return 0.0
+        log_precision = 0.0
+        smoothing = 1.0
+        for matches, total in zip(self.matches, self.totals):
+            if total == 0:
+                # Hypotheses too short for this order: sacrebleu scores the corpus 0
+                return 0.0
+            if matches == 0:
+                smoothing *= 2
+                log_precision += math.log(1 / (smoothing * total))
+            else:
+                log_precision += math.log(matches / total)
+        log_precision /= BLEU_ORDER
+        brevity = 1.0 if self.hyp_length > self.ref_length else math.exp(1 - self.ref_length / self.hyp_length)
+        return 100 * brevity * math.exp(log_precision)
+
+@dataclass
+class ChrfStats:
+    """Sufficient statistics of corpus chrF (character 6-grams, beta 2, whitespace ignored)."""
+    hyp_counts: List[int] = field(default_factory=lambda: [0] * CHRF_ORDER)
+    ref_counts: List[int] = field(default_factory=lambda: [0] * CHRF_ORDER)
+    matches: List[int] = field(default_factory=lambda: [0] * CHRF_ORDER)
+
+    def add(self, hypothesis: str, reference: str):
+        """Add one sentence pair."""
+        hyp_chars = "".join(hypothesis.split())
+        ref_chars = "".join(reference.split())
+        for n in range(1, CHRF_ORDER + 1):
+            hyp_ngrams = ngram_counts(hyp_chars, n)
+            ref_ngrams = ngram_counts(ref_chars, n)
+            ref_total = max(0, len(ref_chars) - n + 1)
+            # Like sacrebleu, hypothesis n-grams only count where the reference has any
+            self.hyp_counts[n - 1] += max(0, len(hyp_chars) - n + 1) if ref_total else 0
+            self.ref_counts[n - 1] += ref_total
+            self.matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+
+    def merge(self, other: "ChrfStats"):
+        """Add another set of statistics to this one."""
+        self.hyp_counts = [a + b for a, b in zip(self.hyp_counts, other.hyp_counts)]
+        self.ref_counts = [a + b for a, b in zip(self.ref_counts, other.ref_counts)]
+        self.matches = [a + b for a, b in zip(self.matches, other.matches)]
+
+    def score(self) -> float:
+        """chrF (0-100): F-beta of the precision and recall averaged over n-gram orders present on both sides."""
+        factor = CHRF_BETA ** 2
+        orders = [
+            (match / hyp, match / ref)
+            for hyp, ref, match in zip(self.hyp_counts, self.ref_counts, self.matches)
+            if hyp > 0 and ref > 0
+        ]
+        if not orders:
+            return 0.0
+        precision = sum(p for p, _ in orders) / len(orders)
+        recall = sum(r for _, r in orders) / len(orders)
+        if precision + recall == 0:
+            return 0.0
+        return 100 * (1 + factor) * precision * recall / (factor * precision + recall)
+
+@dataclass
+class ScoreStats:
+    """BLEU and chrF statistics of a set of sentences."""
+    sentences: int = 0
+    bleu_stats: BleuStats = field(default_factory=BleuStats)
+    chrf_stats: ChrfStats = field(default_factory=ChrfStats)
+
+    def add(self, hypothesis: str, reference: str):
+        self.sentences += 1
+        self.bleu_stats.add(hypothesis, reference)
+        self.chrf_stats.add(hypothesis, reference)
+
+    def merge(self, other: "ScoreStats"):
+        self.sentences += other.sentences
+        self.bleu_stats.merge(other.bleu_stats)
+        self.chrf_stats.merge(other.chrf_stats)
+
+    @property
+    def bleu(self) -> float:
+        return self.bleu_stats.score()
+
+    @property
+    def chrf(self) -> float:
+        return self.chrf_stats.score()
+
+    def summary(self) -> Dict[str, float]:
+        return {"sentences": self.sentences, "bleu": self.bleu, "chrf": self.chrf}
+
+def sentence_chrf(hypothesis: str, reference: str) -> float:
+    """chrF of a single sentence pair."""
+    stats = ChrfStats()
+    stats.add(hypothesis, reference)
+    return stats.score()
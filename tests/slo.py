@@ -0,0 +1,153 @@
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import torch
+
+from load_model import IndicTransModel
+from config.translation_config import PRESETS
+from tests.test_data import TestCase, TEST_CASES, EXPECTED_TIMES, PRESET_TIME_FACTORS
+from utils.stats import percentile
+
+# Latency percentile checked against the upper end of each EXPECTED_TIMES range
+SLO_PERCENTILE = 0.95
+DEFAULT_REPEATS = 5
+
+# CPU threads torch uses for both the host baseline and the SLO translations, so
+# the budgets are scaled by the same kind of speed the latencies measure
+SLO_THREADS = 1
+
+# Host baseline: a fixed float32 matmul workload
+BASELINE_SIZE = 512
+BASELINE_ITERATIONS = 20
+BASELINE_TRIALS = 5
+# Median CPU baseline seconds with SLO_THREADS threads on the reference host. It must be
+# measured on the same host, under the same conditions, as EXPECTED_TIMES: recalibrate both together
+REFERENCE_BASELINE_SECONDS = 0.036
+
+@dataclass
+class SloResult:
+    """Latency SLO check of one preset / difficulty bucket."""
+    preset: str
+    difficulty: str
+    low: float  # expected range, already scaled for preset and host speed
+    high: float
+    latencies: List[float]
+    p50: float
+    p95: float
+    errors: int
+
+    @property
+    def passed(self) -> bool:
+        return self.errors == 0 and self.p95 <= self.high
+
+    @property
+    def suspiciously_fast(self) -> bool:
+        """Faster than the expected range, which usually means empty output or a cache."""
+        return self.p50 < self.low
+
+@contextmanager
+def pinned_threads(threads: int = SLO_THREADS) -> Iterator[None]:
+    """Run torch with ``threads`` CPU threads, restoring the previous count afterwards."""
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+def measure_host_speed(device: str = "cpu") -> float:
+    """
+    Time the baseline workload on ``device`` with SLO_THREADS CPU threads.
+
+    Returns:
+        float: Median seconds over BASELINE_TRIALS runs
+    """
+    with pinned_threads():
+        a = torch.randn(BASELINE_SIZE, BASELINE_SIZE, device=device)
+        b = torch.randn(BASELINE_SIZE, BASELINE_SIZE, device=device)
+        a @ b  # warm up kernels and allocator
+
+        timings = []
+        for _ in range(BASELINE_TRIALS):
+            if device.startswith("cuda"):
+                torch.cuda.synchronize()
+            start_time = time.perf_counter()
+            for _ in range(BASELINE_ITERATIONS):
+                a @ b
+            if device.startswith("cuda"):
+                torch.cuda.synchronize()
+            timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings)
+
+def host_scale(device: str = "cpu", reference: float = REFERENCE_BASELINE_SECONDS) -> float:
+    """
+    How much slower than the reference host this host is (below 1 when faster).
+
+    The reference is a CPU measurement, so GPU latencies are not scaled (1.0).
+    """
+    if not device.startswith("cpu"):
+        return 1.0
+    return measure_host_speed(device) / reference
+
+def check_slos(translator: IndicTransModel, presets: List[str], test_cases: List[TestCase] = TEST_CASES,
+               repeats: int = DEFAULT_REPEATS, scale: float = 1.0) -> List[SloResult]:
+    """
+    Measure single-request latency per preset and difficulty and check it against EXPECTED_TIMES.
+
+    Each test case is translated ``repeats`` times after one untimed warmup per
+    preset, with torch pinned to SLO_THREADS CPU threads like the host
+    baseline. A bucket passes when no translation failed and its p95 latency is
+    within the upper end of its expected range, scaled by the preset's factor
+    and by ``scale`` (see host_scale).
+
+    Returns:
+        List[SloResult]: One result per preset and difficulty present in ``test_cases``
+    """
+    results = []
+    for preset in presets:
+        config = PRESETS[preset]
+        latencies: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        with pinned_threads():
+            translator.translate(test_cases[0].hindi, config=config)
+            for case in test_cases:
+                for _ in range(repeats):
+                    start_time = time.perf_counter()
+                    translation = translator.translate(case.hindi, config=config)
+                    latencies.setdefault(case.difficulty, []).append(time.perf_counter() - start_time)
+                    errors[case.difficulty] = errors.get(case.difficulty, 0) + (translation is None)
+
+        factor = PRESET_TIME_FACTORS.get(preset, 1.0) * scale
+        for difficulty, values in latencies.items():
+            low, high = EXPECTED_TIMES[difficulty]
+            results.append(SloResult(
+                preset=preset,
+                difficulty=difficulty,
+                low=low * factor,
+                high=high * factor,
+                latencies=values,
+                p50=percentile(values, 0.50),
+                p95=percentile(values, SLO_PERCENTILE),
+                errors=errors[difficulty]
+            ))
+    return results
+
+def print_slo_results(results: List[SloResult], scale: Optional[float] = None):
+    """Print one pass/fail line per bucket."""
+    print("\n=== Latency SLOs ===")
+    if scale is not None:
+        print(f"Host speed scale: {scale:.2f}x reference")
+    print(f"{'preset':<14}{'difficulty':<12}{'p50':>8}{'p95':>8}{'budget':>16}  result")
+    for result in results:
+        status = "PASS" if result.passed else "FAIL"
+        if result.errors:
+            status += f" ({result.errors} errors)"
+        elif result.suspiciously_fast:
+            status += " (below expected range)"
+        print(
+            f"{result.preset:<14}{result.difficulty:<12}{result.p50:>8.3f}{result.p95:>8.3f}"
+            f"{f'{result.low:.2f}-{result.high:.2f}s':>16}  {status}"
+        )
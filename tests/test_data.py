@@ -1,5 +1,6 @@
+import json
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterator, Tuple
 
 @dataclass
 class TestCase:
@@ -67,6 +68,55 @@ EXPECTED_TIMES = {
     "hard": (0.5, 2.0)
 }
 
+# EXPECTED_TIMES are for the default preset; other presets scale them roughly with beam width
+PRESET_TIME_FACTORS = {
+    "fast": 0.5,
+    "default": 1.0,
+    "high_quality": 2.0
+}
+
 # Categories for evaluation
 CATEGORIES = ["basic", "complex", "technical"]
-DIFFICULTIES = ["easy", "medium", "hard"] 
\ No newline at end of file
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+def iter_test_cases(path: str, shard: int = 0, num_shards: int = 1) -> Iterator[TestCase]:
+    """
+    Stream test cases from a TSV or JSONL file without loading it whole.
+
+    TSV lines are ``hindi<TAB>english[<TAB>category[<TAB>difficulty]]``; JSONL
+    lines are objects with the TestCase field names, of which category and
+    difficulty are optional. Blank lines are skipped. With ``num_shards`` > 1
+    only every ``num_shards``-th case, starting at ``shard``, is yielded; each
+    shard still reads and decodes the whole file, so only parsing is sharded,
+    not I/O.
+
+    Args:
+        path: File to read; ``.jsonl`` files are parsed as JSON, anything else as TSV
+        shard: Index of the shard to yield
+        num_shards: Number of shards the file is split into
+    """
+    jsonl = path.endswith(".jsonl")
+    index = -1
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            index += 1
+            if index % num_shards != shard:
+                continue
+
+            if jsonl:
+                record = json.loads(line)
+                fields = [record["hindi"], record["english"], record.get("category"), record.get("difficulty")]
+            else:
+                fields = line.split("\t")
+                if len(fields) < 2:
+                    raise ValueError(f"{path}:{line_number}: expected at least two tab-separated fields")
+                fields += [None] * (4 - len(fields))
+            yield TestCase(
+                hindi=fields[0],
+                english=fields[1],
+                category=fields[2] or "corpus",
+                difficulty=fields[3] or "unknown"
+            )
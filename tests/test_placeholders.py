@@ -0,0 +1,28 @@
+from utils.placeholders import mask_spans, restore_spans
+
+def round_trip(text: str) -> str:
+    masked, spans = mask_spans(text)
+    return restore_spans(masked, spans)[0]
+
+def test_dotted_versions_are_masked_whole():
+    masked, spans = mask_spans("नया version v2.3.1 आ गया है।")
+    assert spans == ["version v2.3.1"]
+    assert masked == "नया [0] आ गया है।"
+    assert round_trip("नया version v2.3.1 आ गया है।") == "नया version v2.3.1 आ गया है।"
+
+def test_urls_emails_and_ids_round_trip():
+    text = "ऑर्डर ORD-123456 के लिए https://shop.example.com/orders?id=ORD-123456 या help@example.co.in देखें।"
+    masked, spans = mask_spans(text)
+    assert spans == ["ORD-123456", "https://shop.example.com/orders?id=ORD-123456", "help@example.co.in"]
+    assert round_trip(text) == text
+
+def test_sentence_end_is_not_part_of_span():
+    masked, spans = mask_spans("मैंने iPhone 15 Pro खरीदा. फिर घर गया।")
+    assert spans == ["iPhone 15 Pro"]
+
+def test_dropped_placeholders_are_appended():
+    masked, spans = mask_spans("कीमत 12,499.00 रुपये")
+    assert restore_spans("price rupees", spans) == ("price rupees 12,499.00", [])
+
+def test_existing_placeholder_text_is_left_unmasked():
+    assert mask_spans("देखें [1] और ORD-123456") == ("देखें [1] और ORD-123456", [])
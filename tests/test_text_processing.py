@@ -0,0 +1,22 @@
+import io
+
+from utils.text_processing import iter_chunks
+
+def test_iter_chunks_separates_lines_without_line_breaks():
+    assert list(iter_chunks(["hello world", "second line"])) == ["hello world second line"]
+
+def test_iter_chunks_keeps_line_breaks_as_single_spaces():
+    assert list(iter_chunks(["hello world\n", "second line\n"])) == ["hello world second line"]
+
+def test_iter_chunks_stream_matches_lines():
+    text = "यह एक वाक्य है। दूसरा वाक्य!\nक्या तीसरा?\n" * 50
+    assert list(iter_chunks(io.StringIO(text), window=64)) == list(iter_chunks(text.splitlines(True)))
+
+def test_iter_chunks_respects_token_budget():
+    chunks = list(iter_chunks(io.StringIO("शब्द " * 1000), max_tokens=20))
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert " ".join(chunks) == ("शब्द " * 1000).strip()
+
+def test_iter_chunks_slices_long_lines():
+    line = "यह एक लंबा वाक्य है। " * 2000
+    assert list(iter_chunks([line], window=256)) == list(iter_chunks(io.StringIO(line), window=256))
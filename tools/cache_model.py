@@ -0,0 +1,84 @@
+"""
+Populate the pinned local model artifact directory.
+
+Downloads a checkpoint (optionally at a fixed hub revision) once and saves it as
+safetensors into ``MODEL_PATH``, so the API can start in offline mode and
+memory-map the weights instead of resolving them through the hub on every boot.
+
+Usage:
+    python -m tools.cache_model [--model NAME] [--revision SHA] [--output artifacts/model]
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_model import IndicTransModel
+from api.config import settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "artifact_manifest.json"
+
+
+def cache_model(model_name: str, output_dir: str, revision: Optional[str] = None) -> Dict:
+    """
+    Download a checkpoint and save it as safetensors to ``output_dir``.
+
+    Args:
+        model_name: Hub name of the checkpoint
+        output_dir: Local artifact directory
+        revision: Optional hub revision (branch, tag or commit) to pin
+
+    Returns:
+        Dict: The manifest written next to the checkpoint
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"Downloading {model_name} (revision: {revision or 'latest'})...")
+    model = MBartForConditionalGeneration.from_pretrained(model_name, revision=revision)
+    tokenizer = MBart50TokenizerFast.from_pretrained(model_name, revision=revision)
+
+    model.save_pretrained(str(output), safe_serialization=True)
+    tokenizer.save_pretrained(str(output))
+
+    manifest = {
+        "source_model": model_name,
+        "source_revision": getattr(model.config, "_commit_hash", None) or revision,
+    }
+    with open(output / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Model artifacts written to {output}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache the translation model as local safetensors artifacts")
+    parser.add_argument("--model", default=IndicTransModel.MODEL_NAME, help="Hub name of the checkpoint")
+    parser.add_argument("--revision", default=None, help="Hub revision to pin")
+    parser.add_argument("--output", default=settings.MODEL_PATH, help="Local artifact directory")
+    args = parser.parse_args()
+
+    try:
+        cache_model(args.model, args.output, args.revision)
+    except Exception as e:
+        logger.error(f"Error caching model: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+Offline translation-cache simulator driven by captured traffic.
+
+Replays the request stream of a capture file (see api/capture.py) against
+candidate cache policies and sizes, and reports hit rates and the compute time
+each would have saved, so the production cache can be sized from data:
+
+- Policies: LRU (the production ``cachetools.LRUCache``), LFU, TinyLFU (LRU
+  behind a frequency-sketch admission filter) and W-TinyLFU (a small LRU
+  window in front of a TinyLFU-admitted segmented LRU).
+- Keys: whole requests (preset + text, as in api/optimized_app.py) or single
+  sentences (preset + sentence), which also hit for texts sharing sentences.
+- Capacity: an entry count (like ``maxsize``) or bytes (e.g. ``64MB``), with
+  entry sizes estimated from token counts.
+
+Compute per key is priced with each preset's measured CPU (or inference)
+seconds per input token over the captured cache misses.
+
+Usage:
+    python -m tools.cache_sim logs/traffic.jsonl --entries 1000,10000 --bytes 16MB,64MB
+"""
+import argparse
+import json
+import logging
+import sys
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.deadline import DEFAULT_SECONDS_PER_UNIT
+from config.translation_config import PRESETS
+from utils.text_processing import CHARS_PER_TOKEN
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+POLICIES = ("lru", "lfu", "tinylfu", "w-tinylfu")
+LEVELS = ("request", "segment")
+
+# Estimated bytes of one cache entry besides the translation: key tuple, hash and dict slot
+ENTRY_OVERHEAD_BYTES = 240
+SIZE_UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+# Count-min sketch: rows, counter ceiling (4-bit counters) and sample period per expected entry
+SKETCH_DEPTH = 4
+SKETCH_MAX_COUNT = 15
+SKETCH_SAMPLE_FACTOR = 10
+SKETCH_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+# W-TinyLFU: share of capacity in the admission window, and of the main cache that is protected
+WINDOW_FRACTION = 0.01
+PROTECTED_FRACTION = 0.8
+
+
+@dataclass
+class Access:
+    """One cache lookup of the replayed stream."""
+    request: int  # index of the request it belongs to
+    key: int
+    size: int  # entry size in capacity units (1 per entry, or bytes)
+    cost: float  # compute seconds a hit saves
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of one policy / key level / capacity combination."""
+    policy: str
+    level: str
+    capacity: str
+    lookups: int
+    hits: int
+    hit_rate: float
+    request_hit_rate: float  # requests served entirely from the cache
+    saved_seconds: float
+    total_seconds: float
+
+    @property
+    def saved_fraction(self) -> float:
+        return self.saved_seconds / self.total_seconds if self.total_seconds > 0 else 0.0
+
+
+class FrequencySketch:
+    """Count-min sketch of recent access frequencies, halved every sample period (TinyLFU aging)."""
+
+    def __init__(self, expected_entries: int):
+        width = 64
+        while width < expected_entries:
+            width *= 2
+        self.mask = width - 1
+        self.rows = [[0] * width for _ in range(SKETCH_DEPTH)]
+        self.sample_size = SKETCH_SAMPLE_FACTOR * width
+        self.additions = 0
+
+    def _indexes(self, key: int):
+        for row, multiplier in zip(self.rows, SKETCH_MULTIPLIERS):
+            yield row, ((key * multiplier) >> 23) & self.mask
+
+    def increment(self, key: int):
+        for row, index in self._indexes(key):
+            if row[index] < SKETCH_MAX_COUNT:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            for row in self.rows:
+                row[:] = [count >> 1 for count in row]
+            self.additions //= 2
+
+    def estimate(self, key: int) -> int:
+        return min(row[index] for row, index in self._indexes(key))
+
+
+class LRUPolicy:
+    """Least recently used eviction."""
+
+    def __init__(self, capacity: Optional[int], expected_entries: int):
+        self.capacity = capacity
+        self.entries: "OrderedDict[int, int]" = OrderedDict()
+        self.used = 0
+
+    def access(self, key: int, size: int) -> bool:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return True
+        if self.capacity is not None and size > self.capacity:
+            return False
+        self.admit(key, size)
+        return False
+
+    def admit(self, key: int, size: int):
+        self.entries[key] = size
+        self.used += size
+        while self.capacity is not None and self.used > self.capacity:
+            _, evicted = self.entries.popitem(last=False)
+            self.used -= evicted
+
+
+class LFUPolicy:
+    """Least frequently used eviction, least recently used among equals."""
+
+    def __init__(self, capacity: Optional[int], expected_entries: int):
+        self.capacity = capacity
+        self.entries: Dict[int, Tuple[int, int]] = {}  # key -> (size, frequency)
+        self.buckets: Dict[int, "OrderedDict[int, None]"] = {}  # frequency -> keys, oldest first
+        self.used = 0
+
+    def _bump(self, key: int, frequency: int):
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
+        self.buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def access(self, key: int, size: int) -> bool:
+        if key in self.entries:
+            entry_size, frequency = self.entries[key]
+            self._bump(key, frequency)
+            self.entries[key] = (entry_size, frequency + 1)
+            return True
+        if self.capacity is not None and size > self.capacity:
+            return False
+        while self.capacity is not None and self.used + size > self.capacity:
+            lowest = min(self.buckets)
+            evicted, _ = self.buckets[lowest].popitem(last=False)
+            if not self.buckets[lowest]:
+                del self.buckets[lowest]
+            self.used -= self.entries.pop(evicted)[0]
+        self.entries[key] = (size, 1)
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.used += size
+        return False
+
+
+class TinyLFUPolicy(LRUPolicy):
+    """LRU that only admits a new key if it is more frequent than the entries it would evict."""
+
+    def __init__(self, capacity: Optional[int], expected_entries: int):
+        super().__init__(capacity, expected_entries)
+        self.sketch = FrequencySketch(expected_entries)
+
+    def access(self, key: int, size: int) -> bool:
+        self.sketch.increment(key)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return True
+        if self.capacity is not None and size > self.capacity:
+            return False
+
+        victims = []
+        freed = self.capacity - self.used if self.capacity is not None else size
+        frequency = self.sketch.estimate(key)
+        for victim, victim_size in self.entries.items():
+            if freed >= size:
+                break
+            if self.sketch.estimate(victim) >= frequency:
+                return False
+            victims.append(victim)
+            freed += victim_size
+        for victim in victims:
+            self.used -= self.entries.pop(victim)
+        self.admit(key, size)
+        return False
+
+
+class WTinyLFUPolicy:
+    """
+    W-TinyLFU: new keys enter a small LRU window; keys leaving the window must
+    beat the probation segment's LRU entry on estimated frequency to enter the
+    main segmented LRU, where a second hit promotes them to the protected segment.
+    """
+
+    def __init__(self, capacity: Optional[int], expected_entries: int):
+        self.capacity = capacity
+        self.sketch = FrequencySketch(expected_entries)
+        window = max(1, int(capacity * WINDOW_FRACTION)) if capacity is not None else None
+        self.window = LRUPolicy(window, expected_entries)
+        self.main_capacity = capacity - window if capacity is not None else None
+        self.protected_capacity = (
+            int(self.main_capacity * PROTECTED_FRACTION) if self.main_capacity is not None else None
+        )
+        self.probation: "OrderedDict[int, int]" = OrderedDict()
+        self.protected: "OrderedDict[int, int]" = OrderedDict()
+        self.main_used = 0
+        self.protected_used = 0
+
+    def access(self, key: int, size: int) -> bool:
+        self.sketch.increment(key)
+        if key in self.window.entries:
+            self.window.entries.move_to_end(key)
+            return True
+        if key in self.protected:
+            self.protected.move_to_end(key)
+            return True
+        if key in self.probation:
+            self._promote(key)
+            return True
+        if self.capacity is not None and size > self.capacity:
+            return False
+
+        # Insert into the window; whatever it evicts competes for the main cache
+        self.window.entries[key] = size
+        self.window.used += size
+        while self.window.capacity is not None and self.window.used > self.window.capacity:
+            candidate, candidate_size = self.window.entries.popitem(last=False)
+            self.window.used -= candidate_size
+            self._admit(candidate, candidate_size)
+        return False
+
+    def _promote(self, key: int):
+        size = self.probation.pop(key)
+        self.protected[key] = size
+        self.protected_used += size
+        while self.protected_capacity is not None and self.protected_used > self.protected_capacity:
+            demoted, demoted_size = self.protected.popitem(last=False)
+            self.protected_used -= demoted_size
+            self.probation[demoted] = demoted_size
+
+    def _admit(self, candidate: int, size: int):
+        if self.main_capacity is None:
+            self.probation[candidate] = size
+            self.main_used += size
+            return
+        if size > self.main_capacity:
+            return
+
+        frequency = self.sketch.estimate(candidate)
+        victims = []
+        freed = self.main_capacity - self.main_used
+        for segment in (self.probation, self.protected):
+            for victim, victim_size in segment.items():
+                if freed >= size:
+                    break
+                if self.sketch.estimate(victim) >= frequency:
+                    return
+                victims.append((segment, victim))
+                freed += victim_size
+        for segment, victim in victims:
+            victim_size = segment.pop(victim)
+            self.main_used -= victim_size
+            if segment is self.protected:
+                self.protected_used -= victim_size
+        self.probation[candidate] = size
+        self.main_used += size
+
+
+POLICY_CLASSES = {
+    "lru": LRUPolicy,
+    "lfu": LFUPolicy,
+    "tinylfu": TinyLFUPolicy,
+    "w-tinylfu": WTinyLFUPolicy,
+}
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte size such as "512KB", "64MB" or "1GB" (plain numbers are bytes)."""
+    value = value.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * factor)
+    return int(value)
+
+
+def read_capture(path: str) -> List[Dict]:
+    """Read the successful requests of a capture file, in arrival order."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("status") == 200:
+                    records.append(record)
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def seconds_per_token(records: List[Dict], cost_field: str = "cpu_seconds") -> Dict[str, float]:
+    """
+    Measured compute seconds per input token of each preset, over captured cache misses.
+
+    Presets without measured misses fall back to DEFAULT_SECONDS_PER_UNIT per token and beam.
+    """
+    seconds: Dict[str, float] = {}
+    tokens: Dict[str, int] = {}
+    for record in records:
+        if record.get("cache") == "miss" and record.get(cost_field) is not None:
+            preset = record_preset(record)
+            seconds[preset] = seconds.get(preset, 0.0) + record[cost_field]
+            tokens[preset] = tokens.get(preset, 0) + record["tokens"]
+
+    rates = {}
+    for preset in {record_preset(record) for record in records}:
+        if tokens.get(preset):
+            rates[preset] = seconds[preset] / tokens[preset]
+        else:
+            rates[preset] = DEFAULT_SECONDS_PER_UNIT * PRESETS.get(preset, PRESETS["default"]).num_beams
+    return rates
+
+
+def record_preset(record: Dict) -> str:
+    """Preset a captured request was served with, which is the one its cache entry is keyed by."""
+    return record.get("served_preset") or record.get("preset") or "default"
+
+
+def build_accesses(records: List[Dict], level: str, rates: Dict[str, float], by_bytes: bool) -> List[Access]:
+    """Turn captured requests into cache lookups of one key level."""
+    preset_ids = {preset: index for index, preset in enumerate(sorted({record_preset(r) for r in records}))}
+    accesses = []
+    for index, record in enumerate(records):
+        preset = record_preset(record)
+        if level == "request":
+            items = [(record["text_hash"], record["tokens"])]
+        else:
+            items = record.get("segments") or [(record["text_hash"], record["tokens"])]
+        for item_hash, tokens in items:
+            accesses.append(Access(
+                request=index,
+                key=int(item_hash, 16) * len(preset_ids) + preset_ids[preset],
+                size=ENTRY_OVERHEAD_BYTES + int(tokens * CHARS_PER_TOKEN) if by_bytes else 1,
+                cost=rates[preset] * tokens
+            ))
+    return accesses
+
+
+def simulate(accesses: List[Access], policy: str, level: str, capacity: Optional[int],
+             capacity_label: str) -> SimulationResult:
+    """Replay the lookups against one policy and capacity (None for an unbounded cache)."""
+    mean_size = sum(access.size for access in accesses) / max(1, len(accesses))
+    expected_entries = int(capacity / mean_size) if capacity is not None else len(accesses)
+    cache = POLICY_CLASSES[policy](capacity, max(1, expected_entries))
+
+    hits = 0
+    saved = 0.0
+    misses_by_request: Dict[int, int] = {}
+    for access in accesses:
+        if cache.access(access.key, access.size):
+            hits += 1
+            saved += access.cost
+        else:
+            misses_by_request[access.request] = misses_by_request.get(access.request, 0) + 1
+
+    requests = len({access.request for access in accesses})
+    return SimulationResult(
+        policy=policy,
+        level=level,
+        capacity=capacity_label,
+        lookups=len(accesses),
+        hits=hits,
+        hit_rate=hits / len(accesses) if accesses else 0.0,
+        request_hit_rate=(requests - len(misses_by_request)) / requests if requests else 0.0,
+        saved_seconds=saved,
+        total_seconds=sum(access.cost for access in accesses)
+    )
+
+
+def run_simulations(records: List[Dict], policies: List[str], levels: List[str], entries: List[int],
+                    sizes: List[int], cost_field: str = "cpu_seconds") -> List[SimulationResult]:
+    """Simulate every policy x key level x capacity, plus an unbounded cache per level as the upper bound."""
+    rates = seconds_per_token(records, cost_field)
+    results = []
+    for level in levels:
+        for by_bytes, capacities in ((False, entries), (True, sizes)):
+            if not capacities:
+                continue
+            accesses = build_accesses(records, level, rates, by_bytes)
+            for capacity in capacities:
+                label = f"{capacity / SIZE_UNITS['MB']:.3g}MB" if by_bytes else f"{capacity} entries"
+                for policy in policies:
+                    results.append(simulate(accesses, policy, level, capacity, label))
+        accesses = build_accesses(records, level, rates, by_bytes=False)
+        results.append(simulate(accesses, "lru", level, None, "unbounded"))
+    return results
+
+
+def print_results(results: List[SimulationResult]):
+    """Print one line per simulation."""
+    print("\n=== Cache Simulation ===")
+    print(f"{'level':<9}{'capacity':<16}{'policy':<11}{'hit rate':>9}{'req hits':>9}{'saved (s)':>11}{'saved':>8}")
+    for result in results:
+        print(
+            f"{result.level:<9}{result.capacity:<16}{result.policy:<11}{result.hit_rate * 100:>8.1f}%"
+            f"{result.request_hit_rate * 100:>8.1f}%{result.saved_seconds:>11.1f}{result.saved_fraction * 100:>7.1f}%"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate translation cache policies over captured traffic")
+    parser.add_argument("capture", help="Capture file written with CAPTURE_ENABLED")
+    parser.add_argument("--policies", default=",".join(POLICIES), help="Comma-separated policies")
+    parser.add_argument("--levels", default=",".join(LEVELS), help="Cache keys: request and/or segment")
+    parser.add_argument("--entries", default="1000", help="Comma-separated entry-count capacities")
+    parser.add_argument("--bytes", default="", help="Comma-separated byte capacities, e.g. 16MB,64MB")
+    parser.add_argument("--cost", default="cpu_seconds", choices=("cpu_seconds", "inference_seconds"),
+                        help="Captured measurement used to price a cache miss")
+    parser.add_argument("--output", default=None, help="JSON file to write the results to")
+    args = parser.parse_args(argv)
+
+    policies = args.policies.split(",")
+    unknown = [policy for policy in policies if policy not in POLICY_CLASSES]
+    if unknown:
+        parser.error(f"Unknown policies {unknown}; choose from {list(POLICIES)}")
+
+    records = read_capture(args.capture)
+    if not records:
+        logger.error(f"No successful requests in {args.capture}")
+        return 1
+    logger.info(f"Simulating {len(records)} captured requests")
+
+    results = run_simulations(
+        records,
+        policies=policies,
+        levels=args.levels.split(","),
+        entries=[int(value) for value in args.entries.split(",") if value],
+        sizes=[parse_size(value) for value in args.bytes.split(",") if value],
+        cost_field=args.cost
+    )
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([{**asdict(result), "saved_fraction": result.saved_fraction} for result in results], f, indent=2)
+        logger.info(f"Cache simulation results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+"""
+Open-loop HTTP load generator for the translation API.
+
+Requests are sent at scheduled arrival times (a Poisson process at a target
+rate, or timestamps replayed from a file) whether or not earlier requests have
+finished, so a slow server builds up a backlog instead of silently throttling
+the load. Latency is measured from each request's scheduled arrival, which
+avoids coordinated omission.
+
+Usage:
+    python -m tools.loadgen --rps 2,4,8,16 --duration 30 --mix fast=0.5,default=0.4,high_quality=0.1
+    python -m tools.loadgen --arrivals timestamps.txt --lengths short=1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.test_data import TEST_CASES
+from utils.stats import percentile
+from utils.text_processing import estimate_tokens
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Input-length buckets, in (estimated) tokens per request
+LENGTH_BUCKETS = {"short": 16, "medium": 64, "long": 256}
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_INFLIGHT = 1000
+# A load step is saturated when it exceeds the error rate, misses the p99
+# objective, or is past the latency knee: its p50 is this many times the p50
+# of the lightest step
+DEFAULT_MAX_ERROR_RATE = 0.01
+DEFAULT_KNEE_FACTOR = 3.0
+
+
+@dataclass
+class RequestSpec:
+    """One scheduled request."""
+    offset: float  # seconds after the start of the run
+    preset: str
+    text: str
+    deadline_ms: Optional[int] = None
+
+
+@dataclass
+class RequestOutcome:
+    """Result of one request."""
+    preset: str
+    tokens: int
+    latency: float  # seconds from scheduled arrival to response
+    completed_at: float = 0.0  # seconds after the start of the run
+    status: Optional[int] = None
+    error: str = ""  # "timeout", "connection" or "client_overload" when no response was received
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+@dataclass
+class StepReport:
+    """Aggregated results of one load step."""
+    offered_rps: float
+    duration: float
+    sent: int
+    completed: int
+    achieved_rps: float
+    error_rate: float
+    errors: Dict[str, int]
+    p50: float
+    p90: float
+    p95: float
+    p99: float
+    by_preset: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse "name=weight,..." into normalized weights."""
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def build_text(tokens: int, index: int) -> str:
+    """
+    Build a Hindi input of roughly ``tokens`` tokens from the test sentences.
+
+    The request index is appended so requests within one run do not hit the
+    translation cache. Indices restart at 0 on every invocation, so a second
+    run against the same server does hit it; restart the server between runs
+    to measure uncached latency.
+    """
+    sentences = [case.hindi for case in TEST_CASES]
+    parts = []
+    position = index
+    while estimate_tokens(" ".join(parts)) < tokens or not parts:
+        parts.append(sentences[position % len(sentences)])
+        position += 1
+    return f"{' '.join(parts)} ({index})"
+
+
+def draw(weights: Dict[str, float], rng: random.Random) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def poisson_schedule(rps: float, duration: float, presets: Dict[str, float], lengths: Dict[str, float],
+                     rng: random.Random, first_index: int = 0) -> List[RequestSpec]:
+    """Poisson arrivals at ``rps`` for ``duration`` seconds, with presets and lengths drawn from their mixes."""
+    schedule = []
+    offset = rng.expovariate(rps)
+    while offset < duration:
+        text = build_text(LENGTH_BUCKETS[draw(lengths, rng)], first_index + len(schedule))
+        schedule.append(RequestSpec(offset=offset, preset=draw(presets, rng), text=text))
+        offset += rng.expovariate(rps)
+    return schedule
+
+
+def arrival_schedule(timestamps: Iterable[float], presets: Dict[str, float], lengths: Dict[str, float],
+                     rng: random.Random, speed: float = 1.0) -> List[RequestSpec]:
+    """Replay arrival timestamps (seconds, any origin), ``speed`` times faster than recorded."""
+    timestamps = sorted(timestamps)
+    if not timestamps:
+        return []
+    return [
+        RequestSpec(
+            offset=(ts - timestamps[0]) / speed,
+            preset=draw(presets, rng),
+            text=build_text(LENGTH_BUCKETS[draw(lengths, rng)], index)
+        )
+        for index, ts in enumerate(timestamps)
+    ]
+
+
+def read_timestamps(path: str) -> List[float]:
+    """Read arrival timestamps: one number per line, or JSON lines with a "ts" field."""
+    timestamps = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                timestamps.append(float(json.loads(line)["ts"]) if line.startswith("{") else float(line))
+    return timestamps
+
+
+async def send(client: httpx.AsyncClient, url: str, spec: RequestSpec, start: float) -> RequestOutcome:
+    """Send one request; latency counts from its scheduled arrival."""
+    outcome = RequestOutcome(preset=spec.preset, tokens=estimate_tokens(spec.text), latency=0.0)
+    try:
+        payload = {"text": spec.text, "config": spec.preset}
+        if spec.deadline_ms is not None:
+            payload["deadline_ms"] = spec.deadline_ms
+        response = await client.post(url, json=payload)
+        outcome.status = response.status_code
+    except httpx.TimeoutException:
+        outcome.error = "timeout"
+    except httpx.TransportError:
+        outcome.error = "connection"
+    now = time.perf_counter()
+    outcome.latency = now - (start + spec.offset)
+    outcome.completed_at = now - start
+    return outcome
+
+
+async def run_schedule(url: str, schedule: List[RequestSpec], timeout: float = DEFAULT_TIMEOUT,
+                       max_inflight: int = DEFAULT_MAX_INFLIGHT) -> List[RequestOutcome]:
+    """
+    Send every request at its scheduled time, regardless of outstanding requests.
+
+    Requests beyond ``max_inflight`` outstanding ones are not sent and count as
+    "client_overload" errors, protecting the generator itself.
+    """
+    outcomes: List[RequestOutcome] = []
+    inflight = set()
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        for spec in schedule:
+            delay = start + spec.offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if len(inflight) >= max_inflight:
+                outcomes.append(RequestOutcome(
+                    preset=spec.preset, tokens=estimate_tokens(spec.text), latency=0.0,
+                    completed_at=spec.offset, error="client_overload"
+                ))
+                continue
+
+            task = asyncio.create_task(send(client, url, spec, start))
+            inflight.add(task)
+            task.add_done_callback(lambda done: (inflight.discard(done), outcomes.append(done.result())))
+
+        while inflight:
+            await asyncio.wait(set(inflight))
+    return outcomes
+
+
+def summarize(offered_rps: float, duration: float, outcomes: List[RequestOutcome]) -> StepReport:
+    """Aggregate the outcomes of one load step."""
+    errors: Dict[str, int] = {}
+    for outcome in outcomes:
+        if not outcome.ok:
+            key = outcome.error or str(outcome.status)
+            errors[key] = errors.get(key, 0) + 1
+
+    ok_latencies = [outcome.latency for outcome in outcomes if outcome.ok]
+    # Completions that trail the step still count, over the time they took
+    elapsed = max([duration] + [outcome.completed_at for outcome in outcomes])
+
+    by_preset = {}
+    for preset in sorted({outcome.preset for outcome in outcomes}):
+        preset_outcomes = [outcome for outcome in outcomes if outcome.preset == preset]
+        latencies = [outcome.latency for outcome in preset_outcomes if outcome.ok]
+        by_preset[preset] = {
+            "sent": len(preset_outcomes),
+            "error_rate": 1 - len(latencies) / len(preset_outcomes),
+            "p50": percentile(latencies, 0.50),
+            "p99": percentile(latencies, 0.99),
+        }
+
+    return StepReport(
+        offered_rps=offered_rps,
+        duration=duration,
+        sent=len(outcomes),
+        completed=len(ok_latencies),
+        achieved_rps=len(ok_latencies) / elapsed if elapsed > 0 else 0.0,
+        error_rate=1 - len(ok_latencies) / len(outcomes) if outcomes else 0.0,
+        errors=errors,
+        p50=percentile(ok_latencies, 0.50),
+        p90=percentile(ok_latencies, 0.90),
+        p95=percentile(ok_latencies, 0.95),
+        p99=percentile(ok_latencies, 0.99),
+        by_preset=by_preset
+    )
+
+
+def is_saturated(report: StepReport, baseline_p50: float, max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+                 p99_objective: Optional[float] = None, knee_factor: float = DEFAULT_KNEE_FACTOR) -> bool:
+    """Whether a load step exceeded the error budget, missed the p99 objective or is past the latency knee."""
+    if report.error_rate > max_error_rate:
+        return True
+    if p99_objective is not None and report.p99 > p99_objective:
+        return True
+    return baseline_p50 > 0 and report.p50 > knee_factor * baseline_p50
+
+
+def find_saturation(reports: List[StepReport], max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+                    p99_objective: Optional[float] = None,
+                    knee_factor: float = DEFAULT_KNEE_FACTOR) -> Optional[float]:
+    """Offered RPS of the first saturated step, or None if every step kept up."""
+    steps = sorted(reports, key=lambda step: step.offered_rps)
+    if not steps:
+        return None
+    # The lightest step approximates unloaded latency
+    baseline_p50 = steps[0].p50
+    for report in steps:
+        if is_saturated(report, baseline_p50, max_error_rate, p99_objective, knee_factor):
+            return report.offered_rps
+    return None
+
+
+def print_report(reports: List[StepReport], saturation: Optional[float]):
+    """Print load steps in a readable format."""
+    print("\n=== Load Test Results ===")
+    print(f"{'offered':>8} {'achieved':>8} {'sent':>6} {'errors':>7} {'p50 (s)':>8} {'p95 (s)':>8} "
+          f"{'p99 (s)':>8}  errors")
+    for report in reports:
+        print(f"{report.offered_rps:>8.2f} {report.achieved_rps:>8.2f} {report.sent:>6} "
+              f"{report.error_rate * 100:>6.1f}% {report.p50:>8.3f} {report.p95:>8.3f} {report.p99:>8.3f}  "
+              f"{report.errors or ''}")
+    if saturation is None:
+        print("\nNo saturation within the tested load")
+    else:
+        print(f"\nSaturation point: {saturation:.2f} requests/s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop load generator for /translate")
+    parser.add_argument("--url", default="http://localhost:8000/translate", help="Translation endpoint")
+    parser.add_argument("--rps", default="1", help="Comma-separated target rates, run as successive steps")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step")
+    parser.add_argument("--arrivals", default=None,
+                        help="Replay arrival timestamps from this file instead of Poisson arrivals")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up factor for --arrivals")
+    parser.add_argument("--mix", default="default=1", help="Preset mix, e.g. fast=0.5,default=0.4,high_quality=0.1")
+    parser.add_argument("--lengths", default="short=0.6,medium=0.3,long=0.1",
+                        help=f"Input length mix over {', '.join(LENGTH_BUCKETS)}")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Client timeout in seconds")
+    parser.add_argument("--max-inflight", type=int, default=DEFAULT_MAX_INFLIGHT, help="Outstanding request cap")
+    parser.add_argument("--max-error-rate", type=float, default=DEFAULT_MAX_ERROR_RATE,
+                        help="Error rate that marks a step as saturated")
+    parser.add_argument("--p99-objective", type=float, default=None, help="p99 latency (s) that marks saturation")
+    parser.add_argument("--knee-factor", type=float, default=DEFAULT_KNEE_FACTOR,
+                        help="p50 multiple of the lightest step that marks saturation")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for arrivals and mixes")
+    parser.add_argument("--output", default=None, help="JSON file to write the step reports to")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    presets = parse_mix(args.mix)
+    lengths = parse_mix(args.lengths)
+
+    reports = []
+    if args.arrivals:
+        schedule = arrival_schedule(read_timestamps(args.arrivals), presets, lengths, rng, args.speed)
+        duration = schedule[-1].offset if schedule else 0.0
+        logger.info(f"Replaying {len(schedule)} arrivals over {duration:.1f}s")
+        outcomes = asyncio.run(run_schedule(args.url, schedule, args.timeout, args.max_inflight))
+        reports.append(summarize(len(schedule) / duration if duration > 0 else 0.0, duration, outcomes))
+    else:
+        sent = 0
+        for rps in [float(rate) for rate in args.rps.split(",")]:
+            schedule = poisson_schedule(rps, args.duration, presets, lengths, rng, first_index=sent)
+            sent += len(schedule)
+            logger.info(f"Offering {rps:.2f} requests/s for {args.duration:.0f}s ({len(schedule)} requests)")
+            outcomes = asyncio.run(run_schedule(args.url, schedule, args.timeout, args.max_inflight))
+            reports.append(summarize(rps, args.duration, outcomes))
+
+    saturation = find_saturation(reports, args.max_error_rate, args.p99_objective, args.knee_factor)
+    print_report(reports, saturation)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"steps": [asdict(report) for report in reports], "saturation_rps": saturation}, f, indent=2)
+        logger.info(f"Load test results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
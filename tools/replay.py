@@ -0,0 +1,154 @@
+"""
+Replay captured production traffic against the translation API.
+
+Reads a capture file written by the API with CAPTURE_ENABLED (see
+api/capture.py) and sends every record at its original arrival offset, or
+``--speed`` times faster, with the open-loop sender of tools.loadgen. Texts are
+synthesized from the recorded sentence hashes and token counts: sentences that
+repeated in the captured traffic repeat in the replay, so input lengths, preset
+mix, deadlines and cache behaviour follow the original traffic.
+
+Usage:
+    python -m tools.replay logs/traffic.jsonl --speed 2 --url http://localhost:8000/translate
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.loadgen import (
+    DEFAULT_MAX_INFLIGHT,
+    DEFAULT_TIMEOUT,
+    RequestOutcome,
+    RequestSpec,
+    build_text,
+    percentile,
+    run_schedule,
+    summarize
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def read_capture(path: str, limit: Optional[int] = None) -> List[Dict]:
+    """Read capture records in arrival order, keeping the first ``limit`` arrivals."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    records.sort(key=lambda record: record["ts"])
+    return records[:limit] if limit else records
+
+
+def synthesize_text(record: Dict, sentences: Dict[str, str]) -> str:
+    """
+    Build a stand-in text for a captured request.
+
+    Each recorded sentence hash is mapped to a distinct synthetic sentence of
+    the recorded length the first time it is seen, and to the same sentence
+    afterwards, so repeated sentences and texts repeat in the replay.
+    """
+    segments = record.get("segments") or [[record["text_hash"], record["tokens"]]]
+    parts = []
+    for sentence_hash, tokens in segments:
+        if sentence_hash not in sentences:
+            sentences[sentence_hash] = build_text(tokens, len(sentences))
+        parts.append(sentences[sentence_hash])
+    return " ".join(parts)
+
+
+def replay_schedule(records: List[Dict], speed: float = 1.0) -> List[RequestSpec]:
+    """Schedule captured requests at their recorded offsets, ``speed`` times faster."""
+    if not records:
+        return []
+    sentences: Dict[str, str] = {}
+    start = records[0]["ts"]
+    return [
+        RequestSpec(
+            offset=(record["ts"] - start) / speed,
+            preset=record.get("preset") or "default",
+            text=synthesize_text(record, sentences),
+            deadline_ms=record.get("deadline_ms")
+        )
+        for record in records
+    ]
+
+
+def compare_latencies(records: List[Dict], outcomes: List[RequestOutcome]) -> Dict[str, Dict[str, float]]:
+    """Recorded versus replayed p50/p99 latency of successful requests, per preset."""
+    comparison = {}
+    for preset in sorted({record.get("preset") or "default" for record in records}):
+        recorded = [
+            record["latency"] for record in records
+            if (record.get("preset") or "default") == preset and record.get("status") == 200
+        ]
+        replayed = [outcome.latency for outcome in outcomes if outcome.preset == preset and outcome.ok]
+        comparison[preset] = {
+            "recorded_p50": percentile(recorded, 0.50),
+            "recorded_p99": percentile(recorded, 0.99),
+            "replayed_p50": percentile(replayed, 0.50),
+            "replayed_p99": percentile(replayed, 0.99),
+        }
+    return comparison
+
+
+def print_comparison(comparison: Dict[str, Dict[str, float]]):
+    """Print recorded and replayed latencies side by side."""
+    print("\n=== Recorded vs Replayed Latency (s) ===")
+    print(f"{'preset':<14}{'rec p50':>9}{'rep p50':>9}{'rec p99':>9}{'rep p99':>9}")
+    for preset, values in comparison.items():
+        print(f"{preset:<14}{values['recorded_p50']:>9.3f}{values['replayed_p50']:>9.3f}"
+              f"{values['recorded_p99']:>9.3f}{values['replayed_p99']:>9.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured traffic against /translate")
+    parser.add_argument("capture", help="Capture file written with CAPTURE_ENABLED")
+    parser.add_argument("--url", default="http://localhost:8000/translate", help="Translation endpoint")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up factor (2 = twice as fast)")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N captured requests")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Client timeout in seconds")
+    parser.add_argument("--max-inflight", type=int, default=DEFAULT_MAX_INFLIGHT, help="Outstanding request cap")
+    parser.add_argument("--output", default=None, help="JSON file to write the results to")
+    args = parser.parse_args(argv)
+
+    records = read_capture(args.capture, args.limit)
+    schedule = replay_schedule(records, args.speed)
+    if not schedule:
+        logger.error(f"No requests in {args.capture}")
+        return 1
+
+    duration = schedule[-1].offset
+    logger.info(f"Replaying {len(schedule)} requests over {duration:.1f}s ({args.speed:g}x)")
+    outcomes = asyncio.run(run_schedule(args.url, schedule, args.timeout, args.max_inflight))
+    report = summarize(len(schedule) / duration if duration > 0 else 0.0, duration, outcomes)
+    comparison = compare_latencies(records, outcomes)
+
+    print("\n=== Replay Results ===")
+    print(f"Sent: {report.sent}, completed: {report.completed}, errors: {report.errors or 'none'}")
+    print(f"Offered: {report.offered_rps:.2f} requests/s, achieved: {report.achieved_rps:.2f} requests/s")
+    print(f"Latency p50 {report.p50:.3f}s, p95 {report.p95:.3f}s, p99 {report.p99:.3f}s")
+    print_comparison(comparison)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"speed": args.speed, "report": asdict(report), "by_preset": comparison}, f, indent=2)
+        logger.info(f"Replay results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Build a trimmed Hindi -> English checkpoint from the full mBART-50 model.
+
+mBART-50 shares one 250k-row embedding matrix between the encoder, the decoder
+and the LM head, but translating hi_IN -> en_XX only ever touches the pieces
+used by Devanagari input and Latin output. This tool keeps those rows (plus the
+special and language-code tokens), rewrites the tokenizer ids to match and saves
+a compact checkpoint that ``IndicTransModel(model_path=...)`` loads directly.
+
+Usage:
+    python -m tools.trim_model --output artifacts/mbart-hi-en \\
+        [--corpus hindi.txt english.txt ...]
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+import torch
+from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_model import IndicTransModel
+from config.translation_config import (
+    DEFAULT_CONFIG,
+    FAST_CONFIG,
+    HIGH_QUALITY_CONFIG,
+    FORMAL_CONFIG,
+    CASUAL_CONFIG
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Unicode ranges whose pieces can appear in Hindi input or English output
+KEPT_RANGES = [
+    (0x0020, 0x007E),  # Basic Latin
+    (0x00A0, 0x00BF),  # Latin-1 punctuation and symbols
+    (0x0900, 0x097F),  # Devanagari
+    (0xA8E0, 0xA8FF),  # Devanagari Extended
+    (0x2000, 0x206F),  # General Punctuation
+    (0x20A0, 0x20CF),  # Currency Symbols (₹)
+]
+SPIECE_UNDERLINE = "▁"
+
+MANIFEST_FILE = "trim_manifest.json"
+
+
+def is_kept_piece(piece: str) -> bool:
+    """Return True if every character of a sentencepiece piece is in KEPT_RANGES."""
+    for char in piece.replace(SPIECE_UNDERLINE, ""):
+        code = ord(char)
+        if not any(low <= code <= high for low, high in KEPT_RANGES):
+            return False
+    return True
+
+
+def collect_corpus_ids(tokenizer: MBart50TokenizerFast, paths: Iterable[str]) -> Set[int]:
+    """
+    Tokenize corpus files line by line and collect every token id they use.
+
+    Args:
+        tokenizer: The full (untrimmed) tokenizer
+        paths: Text files with one segment per line
+
+    Returns:
+        Set[int]: Token ids seen in the corpora
+    """
+    ids = set()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    ids.update(tokenizer(line, add_special_tokens=False)["input_ids"])
+    return ids
+
+
+def select_token_ids(tokenizer: MBart50TokenizerFast, corpus_paths: List[str]) -> List[int]:
+    """
+    Choose the token ids that survive trimming.
+
+    Special tokens, language codes, context prompts and any piece made only of
+    Devanagari/Latin/punctuation characters are kept, plus every id the optional
+    corpora actually use.
+
+    Returns:
+        List[int]: Sorted old token ids to keep
+    """
+    kept = set(tokenizer.all_special_ids)
+    kept.update(tokenizer.lang_code_to_id.values())
+    kept.update(tokenizer.added_tokens_decoder.keys())
+
+    vocab = tokenizer.get_vocab()
+    kept.update(idx for piece, idx in vocab.items() if is_kept_piece(piece))
+
+    prompts = [
+        config.context_prompt
+        for config in (DEFAULT_CONFIG, FAST_CONFIG, HIGH_QUALITY_CONFIG, FORMAL_CONFIG, CASUAL_CONFIG)
+        if config.context_prompt
+    ]
+    for prompt in prompts:
+        kept.update(tokenizer(prompt, add_special_tokens=False)["input_ids"])
+
+    if corpus_paths:
+        kept.update(collect_corpus_ids(tokenizer, corpus_paths))
+
+    return sorted(kept)
+
+
+def trim_model(model: MBartForConditionalGeneration, kept_ids: List[int]) -> MBartForConditionalGeneration:
+    """
+    Prune the shared embedding, LM head and final logits bias to ``kept_ids``.
+
+    Args:
+        model: The full mBART model
+        kept_ids: Sorted old token ids to keep
+
+    Returns:
+        MBartForConditionalGeneration: The same model, with a smaller vocabulary
+    """
+    index = torch.tensor(kept_ids, dtype=torch.long)
+    old_to_new = {old: new for new, old in enumerate(kept_ids)}
+    config = model.config
+
+    old_embeddings = model.get_input_embeddings()
+    new_embeddings = torch.nn.Embedding(
+        len(kept_ids),
+        old_embeddings.embedding_dim,
+        padding_idx=old_to_new[config.pad_token_id]
+    )
+    new_embeddings.weight.data = old_embeddings.weight.data[index].clone()
+    model.set_input_embeddings(new_embeddings)
+
+    old_lm_head = model.get_output_embeddings()
+    new_lm_head = torch.nn.Linear(old_lm_head.in_features, len(kept_ids), bias=False)
+    new_lm_head.weight.data = old_lm_head.weight.data[index].clone()
+    model.set_output_embeddings(new_lm_head)
+
+    model.register_buffer("final_logits_bias", model.final_logits_bias[:, index].clone())
+
+    # Remap every token id stored in the model and generation configs
+    config.vocab_size = len(kept_ids)
+    for target in (config, model.generation_config):
+        for attr in ("pad_token_id", "bos_token_id", "eos_token_id",
+                     "decoder_start_token_id", "forced_bos_token_id", "forced_eos_token_id"):
+            value = getattr(target, attr, None)
+            if value is not None:
+                setattr(target, attr, old_to_new[value])
+
+    model.tie_weights()
+    return model
+
+
+def remap_tokenizer_files(output_dir: Path, kept_ids: List[int]):
+    """
+    Rewrite the saved tokenizer files so their ids match the trimmed vocabulary.
+
+    Args:
+        output_dir: Directory the full tokenizer was saved to
+        kept_ids: Sorted old token ids to keep
+    """
+    old_to_new = {old: new for new, old in enumerate(kept_ids)}
+
+    tokenizer_file = output_dir / "tokenizer.json"
+    with open(tokenizer_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    model_data = data["model"]
+    if model_data["type"] != "Unigram":
+        raise ValueError(f"Unsupported tokenizer model type: {model_data['type']}")
+    model_data["vocab"] = [model_data["vocab"][old] for old in kept_ids]
+    model_data["unk_id"] = old_to_new[model_data["unk_id"]]
+
+    data["added_tokens"] = [
+        {**token, "id": old_to_new[token["id"]]}
+        for token in data["added_tokens"]
+        if token["id"] in old_to_new
+    ]
+
+    post_processor = data.get("post_processor") or {}
+    for special in post_processor.get("special_tokens", {}).values():
+        special["ids"] = [old_to_new[idx] for idx in special["ids"]]
+
+    with open(tokenizer_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    config_file = output_dir / "tokenizer_config.json"
+    with open(config_file, "r", encoding="utf-8") as f:
+        tokenizer_config = json.load(f)
+    if "added_tokens_decoder" in tokenizer_config:
+        tokenizer_config["added_tokens_decoder"] = {
+            str(old_to_new[int(idx)]): token
+            for idx, token in tokenizer_config["added_tokens_decoder"].items()
+            if int(idx) in old_to_new
+        }
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(tokenizer_config, f, ensure_ascii=False, indent=2)
+
+    # The sentencepiece model still carries the full vocabulary; drop it so the
+    # remapped tokenizer.json is the only source of ids.
+    for stale in ("sentencepiece.bpe.model",):
+        (output_dir / stale).unlink(missing_ok=True)
+
+
+def verify_checkpoint(output_dir: Path, tokenizer: MBart50TokenizerFast, kept_ids: List[int]):
+    """Check that the trimmed tokenizer encodes the context prompts like the original."""
+    old_to_new = {old: new for new, old in enumerate(kept_ids)}
+    trimmed = MBart50TokenizerFast.from_pretrained(str(output_dir))
+    for text in (DEFAULT_CONFIG.context_prompt, "यह एक परीक्षण वाक्य है।"):
+        original = [old_to_new.get(idx) for idx in tokenizer(text)["input_ids"]]
+        if trimmed(text)["input_ids"] != original:
+            raise ValueError(f"Trimmed tokenizer disagrees with the original on: {text!r}")
+    if trimmed.lang_code_to_id["en_XX"] != old_to_new[tokenizer.lang_code_to_id["en_XX"]]:
+        raise ValueError("Trimmed tokenizer has inconsistent language code ids")
+
+
+def build_trimmed_checkpoint(model_path: str, output_dir: str, corpus_paths: List[str]) -> Dict:
+    """
+    Load the full checkpoint, trim it and save the result to ``output_dir``.
+
+    Returns:
+        Dict: The manifest written next to the checkpoint
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"Loading full checkpoint from {model_path}...")
+    tokenizer = MBart50TokenizerFast.from_pretrained(model_path)
+    model = MBartForConditionalGeneration.from_pretrained(model_path)
+    original_vocab_size = model.config.vocab_size
+
+    kept_ids = select_token_ids(tokenizer, corpus_paths)
+    logger.info(f"Keeping {len(kept_ids)} of {original_vocab_size} tokens")
+
+    model = trim_model(model, kept_ids)
+    model.save_pretrained(str(output), safe_serialization=True)
+    tokenizer.save_pretrained(str(output))
+    remap_tokenizer_files(output, kept_ids)
+    verify_checkpoint(output, tokenizer, kept_ids)
+
+    manifest = {
+        "source_model": model_path,
+        "source_revision": getattr(model.config, "_commit_hash", None),
+        "src_lang": "hi_IN",
+        "tgt_lang": "en_XX",
+        "original_vocab_size": original_vocab_size,
+        "trimmed_vocab_size": len(kept_ids),
+        "corpora": corpus_paths,
+    }
+    with open(output / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Trimmed checkpoint written to {output}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a trimmed Hindi->English mBART-50 checkpoint")
+    parser.add_argument("--model", default=IndicTransModel.MODEL_NAME,
+                        help="Hub name or local directory of the full checkpoint")
+    parser.add_argument("--output", required=True, help="Directory to write the trimmed checkpoint to")
+    parser.add_argument("--corpus", nargs="*", default=[],
+                        help="Optional Hindi/English text files whose tokens must be kept")
+    args = parser.parse_args()
+
+    try:
+        build_trimmed_checkpoint(args.model, args.output, args.corpus)
+    except Exception as e:
+        logger.error(f"Error trimming model: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import re
+from typing import List, Tuple
+
+# A Latin-script word or ID, including dotted/slashed parts such as "v2.3.1" or "SKU-12/B"
+LATIN_WORD = r"[A-Za-z0-9&'+-]*(?:[.:/][A-Za-z0-9]+)*"
+# Spans the model should copy rather than translate, matched in one pass. At each
+# position the alternatives are tried in order, so a URL or email wins over the
+# Latin words and numbers inside it.
+SPAN_PATTERN = re.compile(
+    r"(?P<url>(?:https?://|www\.)[^\s<>\"]*[^\s<>\".,;:!?)\]।])"
+    r"|(?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,})"
+    rf"|(?P<latin>[A-Za-z]{LATIN_WORD}(?: +[A-Za-z0-9]{LATIN_WORD})*)"
+    r"|(?P<number>\d[A-Za-z0-9]*(?:[.,:/-][A-Za-z0-9]+)*)"
+)
+PLACEHOLDER = "[{}]"
+# Placeholders in model output; tolerates spaces the decoder inserts inside the brackets
+PLACEHOLDER_REF = re.compile(r"\[\s*(\d+)\s*\]")
+# Shorter spans cost no more tokens than their placeholder and are left in place
+MIN_SPAN_CHARS = 4
+
+def mask_spans(text: str, min_chars: int = MIN_SPAN_CHARS) -> Tuple[str, List[str]]:
+    """
+    Replace URLs, emails, Latin-script spans and numbers/IDs with numbered placeholders.
+
+    Texts that already contain placeholder-like references (e.g. "[1]") are
+    returned unchanged, since their restoration would be ambiguous.
+
+    Args:
+        text (str): Input text
+        min_chars (int): Spans shorter than this are kept in the text
+
+    Returns:
+        Tuple[str, List[str]]: Masked text, and the original span of each placeholder index
+    """
+    if PLACEHOLDER_REF.search(text):
+        return text, []
+
+    spans = []
+
+    def replace(match: re.Match) -> str:
+        span = match.group(0)
+        if len(span) < min_chars:
+            return span
+        spans.append(span)
+        return PLACEHOLDER.format(len(spans) - 1)
+
+    return SPAN_PATTERN.sub(replace, text), spans
+
+def restore_spans(text: str, spans: List[str]) -> Tuple[str, List[int]]:
+    """
+    Put the original spans back in place of their placeholders in a translation.
+
+    Spans whose placeholder the model dropped are appended at the end, so
+    their content is never lost.
+
+    Args:
+        text (str): Translation of a masked text
+        spans (List[str]): Spans returned by mask_spans
+
+    Returns:
+        Tuple[str, List[int]]: Restored text, and the indexes of the spans found in the translation
+    """
+    if not spans:
+        return text, []
+
+    found = set()
+
+    def replace(match: re.Match) -> str:
+        index = int(match.group(1))
+        if index >= len(spans):
+            return match.group(0)
+        found.add(index)
+        return spans[index]
+
+    text = PLACEHOLDER_REF.sub(replace, text)
+    missing = [span for index, span in enumerate(spans) if index not in found]
+    if missing:
+        text = " ".join([text] + missing)
+    return text, sorted(found)
@@ -0,0 +1,17 @@
+from typing import List
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+    
+    Args:
+        values (List[float]): Samples, in any order
+        fraction (float): Percentile as a fraction, e.g. 0.99
+        
+    Returns:
+        float: The percentile, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
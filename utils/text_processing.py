@@ -1,9 +1,15 @@
 import re
 import logging
-from typing import Dict, Any
+from itertools import chain
+from typing import Dict, Any, Iterable, Iterator, TextIO, Union
 
 logger = logging.getLogger(__name__)
 
+# Sentence boundaries: after a danda or a Latin sentence terminator
+SENTENCE_END = re.compile(r'(?<=[।!?])')
+SENTENCE_TERMINATORS = "।!?"
+WHITESPACE = re.compile(r'\s+')
+
 def clean_text(text: str) -> str:
     """
     Clean input text by removing extra whitespace and normalizing characters.
@@ -24,7 +30,10 @@ def clean_text(text: str) -> str:
         logger.error(f"Error cleaning text: {str(e)}")
         return text
 
-def split_long_text(text: str, max_length: int = 500) -> list:
+# Default chunk length of split_long_text, in characters
+MAX_CHUNK_LENGTH = 500
+
+def split_long_text(text: str, max_length: int = MAX_CHUNK_LENGTH) -> list:
     """
     Split long text into smaller chunks that can be processed by the model.
     
@@ -55,4 +64,117 @@ def split_long_text(text: str, max_length: int = 500) -> list:
         return chunks
     except Exception as e:
         logger.error(f"Error splitting text: {str(e)}")
-        return [text] 
\ No newline at end of file
+        return [text]
+
+def split_sentences(text: str) -> list:
+    """
+    Split text into its non-empty sentences, without surrounding whitespace.
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        list: Sentences in order
+    """
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+
+# Average characters per mBART-50 sentencepiece token for Hindi/English text
+CHARS_PER_TOKEN = 3.0
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheaply estimate the number of model tokens in a text without tokenizing it.
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        int: Estimated token count (at least 1)
+    """
+    return max(1, int(len(text) / CHARS_PER_TOKEN))
+
+# Characters iter_chunks reads from a stream at a time, and buffers at most before splitting
+STREAM_WINDOW = 64 * 1024
+# Token budget of a streamed chunk, matching split_long_text's default chunk length
+DEFAULT_CHUNK_TOKENS = int(MAX_CHUNK_LENGTH / CHARS_PER_TOKEN)
+
+def _last_boundary(text: str) -> int:
+    """End of the last complete sentence in text, else its last whitespace, else its length."""
+    end = max(text.rfind(mark) for mark in SENTENCE_TERMINATORS) + 1
+    if end > 0:
+        return end
+    space = max(text.rfind(" "), text.rfind("\n"), text.rfind("\t"))
+    return space if space > 0 else len(text)
+
+def _split_oversized(sentence: str, max_chars: int) -> Iterator[str]:
+    """Cut a sentence longer than max_chars at whitespace, or mid-word if it has none."""
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        yield sentence[:cut]
+        sentence = sentence[cut:].lstrip()
+    if sentence:
+        yield sentence
+
+def _line_pieces(lines: Iterable[str], window: int) -> Iterator[str]:
+    """Yield lines in slices of at most ``window`` characters, ending each line with whitespace."""
+    for line in lines:
+        # Lines may come without their line breaks; keep words on adjacent lines apart
+        if not line[-1:].isspace():
+            line += "\n"
+        for start in range(0, len(line), window):
+            yield line[start:start + window]
+
+def iter_chunks(source: Union[TextIO, Iterable[str]], max_tokens: int = DEFAULT_CHUNK_TOKENS,
+                window: int = STREAM_WINDOW) -> Iterator[str]:
+    """
+    Lazily split a text stream into cleaned chunks of whole sentences.
+    
+    Unlike split_long_text, the text is never held in memory at once: a file
+    object is read ``window`` characters at a time, and lines from an iterable
+    are fed through in slices of at most ``window`` characters, so the buffer
+    stays bounded by about two windows plus one chunk, and the first chunk is
+    available as soon as the first window has been read. (Each line of an
+    iterable is still held whole by the iterable itself while it is sliced;
+    pass a file object to bound memory for files with very long lines.) Sentences are packed into chunks of at most
+    ``max_tokens`` estimated tokens; a sentence longer than that is cut at
+    whitespace. A window without any sentence terminator is split at its
+    last whitespace instead.
+    
+    Args:
+        source (Union[TextIO, Iterable[str]]): Text stream (anything with ``read``) or iterable
+            of lines, with or without their line breaks
+        max_tokens (int): Estimated token budget of each chunk
+        window (int): Characters read and buffered before splitting
+        
+    Yields:
+        str: Whitespace-normalized chunks in document order
+    """
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    if hasattr(source, "read"):
+        pieces = iter(lambda: source.read(window), "")
+    else:
+        pieces = _line_pieces(source, window)
+    pending = ""
+    chunk = ""
+    for piece in chain(pieces, [None]):
+        if piece is not None:
+            pending += piece
+            if len(pending) < window:
+                continue
+            cut = _last_boundary(pending)
+        else:
+            cut = len(pending)
+        complete, pending = pending[:cut], pending[cut:]
+
+        for sentence in SENTENCE_END.split(complete):
+            sentence = WHITESPACE.sub(" ", sentence).strip()
+            for part in _split_oversized(sentence, max_chars):
+                if chunk and len(chunk) + 1 + len(part) > max_chars:
+                    yield chunk
+                    chunk = part
+                else:
+                    chunk = f"{chunk} {part}" if chunk else part
+    if chunk:
+        yield chunk